@@ -0,0 +1,135 @@
+"""
+Compare CPU inference backends against the float32 PyTorch baseline.
+
+For each model key the sample sentences are translated with every backend;
+the report gives the speedup over the baseline and BLEU/chrF of each
+backend's output scored against the baseline's output (drift, where 100 means
+identical translations). Each entry records the backend that actually ran:
+IndicTrans2 can't be exported to ONNX, so its "onnx" run is dynamic int8.
+
+    python backend_comparison.py --backends int8 onnx --model-keys en_to_indic en_to_zh
+"""
+import argparse
+import json
+import time
+
+import sacrebleu
+
+from core_translator import CoreTranslator
+
+# Small built-in sample set, per model key
+SAMPLE_SETS = {
+    "en_to_indic": ("eng_Latn", "hin_Deva", [
+        "The weather is pleasant today.",
+        "Please submit the form before Friday.",
+        "Our office will remain closed on public holidays.",
+        "Click the button below to reset your password.",
+        "The train to Delhi is running two hours late.",
+        "Thank you for choosing our service.",
+        "Drink plenty of water during the summer months.",
+        "The meeting has been moved to next Tuesday afternoon."
+    ]),
+    "indic_to_en": ("hin_Deva", "eng_Latn", [
+        "आज मौसम सुहावना है।",
+        "कृपया शुक्रवार से पहले फॉर्म जमा करें।",
+        "सार्वजनिक छुट्टियों पर हमारा कार्यालय बंद रहेगा।",
+        "अपना पासवर्ड रीसेट करने के लिए नीचे दिए गए बटन पर क्लिक करें।",
+        "दिल्ली जाने वाली ट्रेन दो घंटे देरी से चल रही है।",
+        "हमारी सेवा चुनने के लिए धन्यवाद।"
+    ]),
+    "en_to_zh": ("eng_Latn", "zh", [
+        "The weather is pleasant today.",
+        "Please submit the form before Friday.",
+        "Our office will remain closed on public holidays.",
+        "Click the button below to reset your password.",
+        "Thank you for choosing our service.",
+        "The meeting has been moved to next Tuesday afternoon."
+    ]),
+    "zh_to_en": ("zh", "eng_Latn", [
+        "今天天气很好。",
+        "请在星期五之前提交表格。",
+        "我们的办公室在公共假日期间关闭。",
+        "点击下面的按钮重置您的密码。",
+        "感谢您选择我们的服务。"
+    ])
+}
+
+
+def _timed_translate(translator, model_key, repeats):
+    src_lang, tgt_lang, sentences = SAMPLE_SETS[model_key]
+    items = [(sentence, src_lang, tgt_lang) for sentence in sentences]
+
+    # The first call loads the model and warms it up; it is not timed.
+    translator.translate_model_batch(model_key, items[:1])
+
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        outputs = translator.translate_model_batch(model_key, items)
+    elapsed = (time.perf_counter() - start_time) / repeats
+    return outputs, elapsed
+
+
+def _backend_used(translator, model_key):
+    if translator.inference_backend == "pytorch":
+        return "pytorch"
+    for _, resident_key, model in translator.model_residency.resident_models():
+        if resident_key == model_key:
+            # ONNX Runtime models have no state_dict, see ModelResidencyManager.estimate_footprint
+            return "onnx" if not hasattr(model, "state_dict") else "int8"
+    return None
+
+
+def compare_backends(models_dir="ds_models/translation", backends=("int8", "onnx"), model_keys=None, repeats=3):
+    model_keys = model_keys or list(SAMPLE_SETS)
+    baseline = CoreTranslator(models_dir, inference_backend="pytorch")
+
+    report = {"device": baseline.device, "repeats": repeats, "models": {}}
+    for model_key in model_keys:
+        reference, baseline_seconds = _timed_translate(baseline, model_key, repeats)
+        tokenize = "zh" if SAMPLE_SETS[model_key][1] == "zh" else "13a"
+
+        results = {"pytorch": {"seconds_per_batch": round(baseline_seconds, 4), "speedup": 1.0}}
+        for backend in backends:
+            translator = CoreTranslator(models_dir, inference_backend=backend)
+            outputs, seconds = _timed_translate(translator, model_key, repeats)
+            results[backend] = {
+                "backend_used": _backend_used(translator, model_key),
+                "seconds_per_batch": round(seconds, 4),
+                "speedup": round(baseline_seconds / seconds, 2) if seconds > 0 else None,
+                "bleu_vs_float32": round(sacrebleu.corpus_bleu(outputs, [reference], tokenize=tokenize).score, 2),
+                "chrf_vs_float32": round(sacrebleu.corpus_chrf(outputs, [reference]).score, 2),
+                "footprint_mb": next(
+                    (m["footprint_mb"] for m in translator.get_model_status()["models"] if m["model_key"] == model_key),
+                    None
+                )
+            }
+            # Drop the backend's models before loading the next one
+            translator.model_residency.evict(translator._get_model_type(model_key), model_key)
+
+        report["models"][model_key] = results
+        baseline.model_residency.evict(baseline._get_model_type(model_key), model_key)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CPU inference backends against float32")
+    parser.add_argument("--models-dir", default="ds_models/translation",
+                        help="Same models directory TranslationService uses")
+    parser.add_argument("--backends", nargs="+", default=["int8", "onnx"],
+                        choices=[b for b in CoreTranslator.INFERENCE_BACKENDS if b != "pytorch"])
+    parser.add_argument("--model-keys", nargs="+", choices=list(SAMPLE_SETS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = compare_backends(args.models_dir, args.backends, args.model_keys, args.repeats)
+    rendered = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(rendered)
+    print(rendered)
+
+
+if __name__ == "__main__":
+    main()
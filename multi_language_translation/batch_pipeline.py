@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BatchPipeline:
+    """
+    Overlaps the CPU side of batch translation with generate.
+
+    A run takes a list of batches and three functions: ``prepare_fn``
+    (normalization, transliteration, tokenization), ``generate_fn`` and
+    ``finish_fn`` (decode, postprocessing). Generate runs on the calling
+    thread one batch at a time, in order; prepare and finish run on a pool
+    of ``cpu_workers`` threads, with up to ``depth`` batches prepared ahead
+    of the one generating. Busy time per stage is accumulated so the pool
+    and lookahead can be sized from ``get_stats()``.
+    """
+
+    STAGES = ("prepare", "generate", "finish")
+
+    def __init__(self, cpu_workers=2, depth=2):
+        self.cpu_workers = max(1, int(cpu_workers))
+        self.depth = max(1, int(depth))
+
+        self._pool = None
+        self._lock = threading.Lock()
+        self._busy = {stage: 0.0 for stage in self.STAGES}
+        self._generate_stalled = 0.0
+        self._wall = 0.0
+        self._runs = 0
+        self._batches = 0
+
+        # Pool threads don't survive fork; serve.py workers start their own
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.cpu_workers, thread_name_prefix="translate-cpu")
+            return self._pool
+
+    def _timed(self, stage, fn, *args):
+        start_time = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._add_busy(stage, time.perf_counter() - start_time)
+
+    def _add_busy(self, stage, seconds):
+        with self._lock:
+            self._busy[stage] += seconds
+
+    def run(self, batches, prepare_fn, generate_fn, finish_fn, stop_on_error=True):
+        """
+        Push every batch through prepare → generate → finish. Returns one
+        (result, error) pair per batch, in order; with ``stop_on_error`` the
+        first failure is raised once in-flight work has drained.
+
+        ``finish_fn(prepared, generated, error)`` is always called for a
+        prepared batch, with ``error`` set when generate failed, so it can
+        release whatever prepare acquired.
+        """
+        pool = self._get_pool()
+        started_at = time.perf_counter()
+        outcomes = [None] * len(batches)
+        prepared_futures = deque()
+        finish_futures = []
+        next_batch = 0
+        failed = None
+
+        def submit_prepare():
+            nonlocal next_batch
+            prepared_futures.append(
+                (next_batch, pool.submit(self._timed, "prepare", prepare_fn, batches[next_batch]))
+            )
+            next_batch += 1
+
+        try:
+            while next_batch < len(batches) and len(prepared_futures) < self.depth:
+                submit_prepare()
+
+            while prepared_futures:
+                index, future = prepared_futures.popleft()
+                wait_started = time.perf_counter()
+                try:
+                    prepared = future.result()
+                except Exception as e:
+                    outcomes[index] = (None, e)
+                    failed = failed or e
+                    if stop_on_error:
+                        break
+                    continue
+                finally:
+                    self._add_stalled(time.perf_counter() - wait_started)
+
+                # Keep the lookahead full while this batch generates
+                if next_batch < len(batches) and not (failed and stop_on_error):
+                    submit_prepare()
+
+                generated, error = None, None
+                try:
+                    generated = self._timed("generate", generate_fn, prepared)
+                except Exception as e:
+                    error = e
+                finish_futures.append(
+                    (index, pool.submit(self._timed, "finish", finish_fn, prepared, generated, error))
+                )
+                if error is not None:
+                    failed = failed or error
+                    if stop_on_error:
+                        break
+        finally:
+            # Drain whatever is still in flight so prepared batches are released
+            for index, future in prepared_futures:
+                try:
+                    prepared = future.result()
+                except Exception as e:
+                    outcomes[index] = (None, e)
+                    continue
+                cancelled = RuntimeError("Batch skipped after an earlier batch failed")
+                finish_futures.append(
+                    (index, pool.submit(finish_fn, prepared, None, cancelled))
+                )
+            for index, future in finish_futures:
+                try:
+                    outcomes[index] = (future.result(), None)
+                except Exception as e:
+                    outcomes[index] = (None, e)
+                    failed = failed or e
+
+            with self._lock:
+                self._wall += time.perf_counter() - started_at
+                self._runs += 1
+                self._batches += len(batches)
+
+        if failed is not None and stop_on_error:
+            raise failed
+        return outcomes
+
+    def _add_stalled(self, seconds):
+        with self._lock:
+            self._generate_stalled += seconds
+
+    def get_stats(self) -> dict:
+        """
+        Busy seconds per stage and how much of the pipelined wall time each
+        stage kept its threads busy. Generate has one thread, prepare and
+        finish share the CPU pool; ``generate_stalled_seconds`` is time the
+        model sat idle waiting for the next batch to be prepared.
+        """
+        with self._lock:
+            wall = self._wall
+            stages = {
+                stage: {
+                    "busy_seconds": round(busy, 3),
+                    "utilization": round(busy / wall, 3) if wall else 0.0
+                }
+                for stage, busy in self._busy.items()
+            }
+            cpu_busy = self._busy["prepare"] + self._busy["finish"]
+            return {
+                "cpu_workers": self.cpu_workers,
+                "depth": self.depth,
+                "runs": self._runs,
+                "batches": self._batches,
+                "wall_seconds": round(wall, 3),
+                "stages": stages,
+                "cpu_pool_utilization": round(cpu_busy / (wall * self.cpu_workers), 3) if wall else 0.0,
+                "generate_stalled_seconds": round(self._generate_stalled, 3)
+            }
@@ -0,0 +1,265 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from inference_executor import RequestCancelledError, attach_cancel_token, current_cancel_token
+
+
+class _PendingRequest:
+    __slots__ = ("item", "exclusive", "future", "enqueued_at", "cancel_token")
+
+    def __init__(self, item, exclusive=False):
+        self.item = item
+        # An already formed batch, (fn, args), run on its own by a worker
+        self.exclusive = exclusive
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+        # Token of the request that submitted this item, see inference_executor
+        self.cancel_token = current_cancel_token()
+
+    @property
+    def cancelled(self):
+        return self.cancel_token is not None and self.cancel_token.cancelled
+
+
+class _BatchCancellation:
+    """Cancelled only once every request in the batch has been abandoned."""
+
+    def __init__(self, batch):
+        self.batch = batch
+
+    @property
+    def cancelled(self):
+        return all(request.cancelled for request in self.batch)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise RequestCancelledError()
+
+
+class MicroBatchScheduler:
+    """
+    Collects concurrent translation requests per model key and runs them
+    through the model as a single padded batch.
+
+    Each model key gets its own queue and ``workers_per_key`` worker threads
+    that take batches from it, so several batches of one model can generate
+    at once. A batch is flushed as soon as it reaches ``max_batch_size`` or
+    the oldest request in it has waited ``max_wait_ms``.
+
+    Callers that form their own batches (file and multi-target translation)
+    hand them in with ``run_exclusive`` so they run on the same workers,
+    never more than ``workers_per_key`` generating at once per key.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=10.0, stats_history=100,
+                 workers_per_key=1, worker_init=None):
+        """
+        ``batch_fn(model_key, items)`` must return one result per item, in order.
+        ``worker_init(index)`` runs on each worker thread before its first batch.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.workers_per_key = max(1, int(workers_per_key))
+        self.worker_init = worker_init
+
+        self._queues = {}
+        self._workers = {}
+        self._lock = threading.Lock()
+
+        self._recent_batches = deque(maxlen=stats_history)
+        self._totals = {}
+        self._exclusive_runs = {}
+        self._cancelled = 0
+
+    def submit(self, model_key, item) -> Future:
+        request = _PendingRequest(item)
+        self._get_queue(model_key).put(request)
+        return request.future
+
+    def run_exclusive(self, model_key, fn, *args) -> Future:
+        """Run ``fn(*args)`` on one of the key's workers, outside any micro-batch."""
+        request = _PendingRequest((fn, args), exclusive=True)
+        self._get_queue(model_key).put(request)
+        return request.future
+
+    def _get_queue(self, model_key):
+        with self._lock:
+            if model_key not in self._queues:
+                self._queues[model_key] = queue.Queue()
+                self._workers[model_key] = []
+                for index in range(self.workers_per_key):
+                    worker = threading.Thread(
+                        target=self._worker_loop,
+                        args=(model_key, index),
+                        name=f"batch-{model_key}-{index}",
+                        daemon=True
+                    )
+                    self._workers[model_key].append(worker)
+                    worker.start()
+            return self._queues[model_key]
+
+    def stop(self):
+        """Finish what is queued, then stop every worker."""
+        with self._lock:
+            queues = list(self._queues.items())
+        for model_key, request_queue in queues:
+            for _ in self._workers[model_key]:
+                request_queue.put(None)
+        for model_key, _ in queues:
+            for worker in self._workers[model_key]:
+                worker.join()
+
+    def _collect_batch(self, request_queue):
+        """
+        (batch, stop): a None in the queue tells one worker to exit. An
+        exclusive request ends collection and is returned last in the batch.
+        """
+        first = request_queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        if first.exclusive:
+            return batch, False
+        deadline = first.enqueued_at + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = request_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            if request.exclusive:
+                return batch, False
+
+        # Drain anything that is already waiting, without blocking further.
+        while len(batch) < self.max_batch_size:
+            try:
+                request = request_queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+            if request.exclusive:
+                return batch, False
+
+        return batch, False
+
+    def _worker_loop(self, model_key, index=0):
+        if self.worker_init is not None:
+            self.worker_init(index)
+        request_queue = self._queues[model_key]
+        stop = False
+        while not stop:
+            batch, stop = self._collect_batch(request_queue)
+            exclusive = batch[-1] if batch and batch[-1].exclusive else None
+            if exclusive is not None:
+                batch = batch[:-1]
+
+            # Requests abandoned while they waited don't take part
+            live = []
+            for request in batch:
+                if request.cancelled:
+                    request.future.set_exception(RequestCancelledError())
+                else:
+                    live.append(request)
+            with self._lock:
+                self._cancelled += len(batch) - len(live)
+            if live:
+                self._run_batch(model_key, live)
+            if exclusive is not None:
+                self._run_exclusive(model_key, exclusive)
+
+    def _run_exclusive(self, model_key, request):
+        if request.cancelled:
+            request.future.set_exception(RequestCancelledError())
+            with self._lock:
+                self._cancelled += 1
+            return
+        fn, args = request.item
+        try:
+            with attach_cancel_token(request.cancel_token):
+                result = fn(*args)
+        except Exception as e:
+            request.future.set_exception(e)
+        else:
+            request.future.set_result(result)
+        with self._lock:
+            self._exclusive_runs[model_key] = self._exclusive_runs.get(model_key, 0) + 1
+
+    def _run_batch(self, model_key, batch):
+        started_at = time.perf_counter()
+
+        try:
+            with attach_cancel_token(_BatchCancellation(batch)):
+                results = self.batch_fn(model_key, [request.item for request in batch])
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            results = None
+        else:
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+        finished_at = time.perf_counter()
+        self._record_batch(model_key, batch, started_at, finished_at, results is not None)
+
+    def _record_batch(self, model_key, batch, started_at, finished_at, succeeded):
+        wait_ms = max((started_at - request.enqueued_at) * 1000 for request in batch)
+        generate_ms = (finished_at - started_at) * 1000
+
+        entry = {
+            "model_key": model_key,
+            "batch_size": len(batch),
+            "max_wait_ms": round(wait_ms, 2),
+            "generate_ms": round(generate_ms, 2),
+            "status": "success" if succeeded else "error",
+            "timestamp": time.time()
+        }
+
+        with self._lock:
+            self._recent_batches.append(entry)
+            totals = self._totals.setdefault(model_key, {
+                "batches": 0,
+                "requests": 0,
+                "errors": 0,
+                "total_generate_ms": 0.0
+            })
+            totals["batches"] += 1
+            totals["requests"] += len(batch)
+            totals["total_generate_ms"] += generate_ms
+            if not succeeded:
+                totals["errors"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            per_model = {}
+            for model_key, totals in self._totals.items():
+                batches = totals["batches"]
+                per_model[model_key] = {
+                    "batches": batches,
+                    "requests": totals["requests"],
+                    "errors": totals["errors"],
+                    "avg_batch_size": round(totals["requests"] / batches, 2) if batches else 0.0,
+                    "avg_generate_ms": round(totals["total_generate_ms"] / batches, 2) if batches else 0.0,
+                    "queue_depth": self._queues[model_key].qsize()
+                }
+
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "workers_per_key": self.workers_per_key,
+                "models": per_model,
+                "exclusive_runs": dict(self._exclusive_runs),
+                "cancelled_before_batch": self._cancelled,
+                "recent_batches": list(self._recent_batches)
+            }
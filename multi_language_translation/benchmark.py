@@ -0,0 +1,466 @@
+"""
+Translation throughput and latency benchmark.
+
+Runs fixed corpora for each supported language pair at several input
+lengths and batch sizes, through ``CoreTranslator.translate_batch`` (mode
+``core``; batch size = texts per call) and ``TranslationService.translate_text``
+(mode ``service``; batch size = concurrent requests, so micro-batching
+kicks in). Each run reports sentences/sec, source tokens/sec, p50/p95/p99
+latency per call and the process peak RSS so far; model load times are
+reported per model key. Translation memory and the pivot cache are
+disabled so every run does real work.
+
+    python benchmark.py --pairs eng_Latn:hin_Deva zh:eng_Latn --batch-sizes 1 8 32 --output bench.json
+
+``--replica-sweep`` instead pushes one corpus through the micro-batch
+scheduler under every replicas × threads split of the CPUs (see
+replicas.py) and reports the one with the highest throughput:
+
+    python benchmark.py --replica-sweep --pairs eng_Latn:hin_Deva --corpus-size 512
+
+``--stub`` swaps every model for a tiny randomly initialized Marian model
+with a hashing tokenizer. Nothing is downloaded, so it runs offline on CPU
+and is meant for spotting regressions in the pipeline around the model
+(batching, segmentation, routing), not for absolute numbers.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# Caches would turn repeated corpora into lookups; set before config is imported
+os.environ.setdefault("TRANSLATION_MEMORY_ENABLED", "0")
+os.environ.setdefault("TRANSLATION_PIVOT_CACHE_ENTRIES", "0")
+
+import torch
+
+from batch_scheduler import MicroBatchScheduler
+from core_translator import CoreTranslator
+from decoding_profiles import DECODING_PROFILES, DEFAULT_PROFILE
+from replicas import candidate_layouts
+from segmentation import segment_text
+
+# Source sentences per language; corpora are built by cycling through them
+BENCH_SENTENCES = {
+    "eng_Latn": [
+        "The weather is pleasant today.",
+        "Please submit the form before Friday.",
+        "Our office will remain closed on public holidays.",
+        "Click the button below to reset your password.",
+        "The train to Delhi is running two hours late.",
+        "Thank you for choosing our service.",
+        "Drink plenty of water during the summer months.",
+        "The meeting has been moved to next Tuesday afternoon."
+    ],
+    "hin_Deva": [
+        "आज मौसम सुहावना है।",
+        "कृपया शुक्रवार से पहले फॉर्म जमा करें।",
+        "सार्वजनिक छुट्टियों पर हमारा कार्यालय बंद रहेगा।",
+        "अपना पासवर्ड रीसेट करने के लिए नीचे दिए गए बटन पर क्लिक करें।",
+        "दिल्ली जाने वाली ट्रेन दो घंटे देरी से चल रही है।",
+        "हमारी सेवा चुनने के लिए धन्यवाद।"
+    ],
+    "urd_Arab": [
+        "آج موسم خوشگوار ہے۔",
+        "براہ کرم جمعہ سے پہلے فارم جمع کرائیں۔",
+        "ہمارا دفتر عام تعطیلات پر بند رہے گا۔",
+        "ہماری سروس منتخب کرنے کا شکریہ۔"
+    ],
+    "zh": [
+        "今天天气很好。",
+        "请在星期五之前提交表格。",
+        "我们的办公室在公共假日期间关闭。",
+        "点击下面的按钮重置您的密码。",
+        "感谢您选择我们的服务。"
+    ]
+}
+
+# Sentences per text; "long" crosses the segmentation threshold
+INPUT_LENGTHS = {"short": 1, "medium": 3, "long": 8}
+
+
+class _StubEncoding(dict):
+    def to(self, device):
+        return _StubEncoding({key: value.to(device) for key, value in self.items()})
+
+
+class StubTokenizer:
+    """Whitespace tokenizer hashing words into a fixed vocabulary; 0 = pad, 1 = eos, 2 = unk."""
+
+    def __init__(self, vocab_size):
+        self.vocab_size = vocab_size
+        self.pad_token_id = 0
+        self._words = {}
+        self._lock = threading.Lock()
+
+    def _encode(self, text, max_length=None):
+        ids = []
+        for word in text.split():
+            token_id = 3 + zlib.crc32(word.encode("utf-8")) % (self.vocab_size - 3)
+            with self._lock:
+                self._words.setdefault(token_id, word)
+            ids.append(token_id)
+        if max_length:
+            ids = ids[:max_length - 1]
+        return ids + [1]
+
+    def __call__(self, texts, padding=False, truncation=False, max_length=None, return_tensors=None):
+        encoded = [self._encode(text, max_length if truncation else None) for text in texts]
+        if return_tensors != "pt":
+            return {"input_ids": encoded}
+        width = max(len(ids) for ids in encoded)
+        input_ids = torch.zeros((len(encoded), width), dtype=torch.long)
+        attention_mask = torch.zeros((len(encoded), width), dtype=torch.long)
+        for row, ids in enumerate(encoded):
+            input_ids[row, :len(ids)] = torch.tensor(ids)
+            attention_mask[row, :len(ids)] = 1
+        return _StubEncoding(input_ids=input_ids, attention_mask=attention_mask)
+
+    def batch_decode(self, sequences, skip_special_tokens=True):
+        decoded = []
+        for ids in sequences.tolist():
+            words = [
+                self._words.get(token_id, f"w{token_id}")
+                for token_id in ids
+                if not (skip_special_tokens and token_id < 3)
+            ]
+            decoded.append(" ".join(words))
+        return decoded
+
+
+def _stub_loader(model_key, device="cpu", vocab_size=4096):
+    from transformers import MarianConfig, MarianMTModel
+
+    # Same seed per key, so every run benchmarks the same weights
+    torch.manual_seed(zlib.crc32(model_key.encode("utf-8")))
+    config = MarianConfig(
+        vocab_size=vocab_size, d_model=64, encoder_layers=2, decoder_layers=2,
+        encoder_attention_heads=4, decoder_attention_heads=4, encoder_ffn_dim=128, decoder_ffn_dim=128,
+        max_position_embeddings=1024, pad_token_id=0, eos_token_id=1, decoder_start_token_id=0,
+        forced_eos_token_id=1
+    )
+    model = MarianMTModel(config).to(device).eval()
+    return model, StubTokenizer(vocab_size)
+
+
+def install_stub_models(core):
+    """Make ``core`` load tiny random models instead of downloading the real ones."""
+    def load(model_key):
+        return _stub_loader(model_key, device=core.device)
+
+    core._load_indictrans_weights = load
+    core._load_opus_weights = load
+
+
+def build_corpus(src_lang, length, size):
+    sentences = BENCH_SENTENCES[src_lang]
+    per_text = INPUT_LENGTHS[length]
+    separator = "" if src_lang == "zh" else " "
+    return [
+        separator.join(sentences[(index + offset) % len(sentences)] for offset in range(per_text))
+        for index in range(size)
+    ]
+
+
+def _percentile(values, percent):
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _count_tokens(core, src_lang, tgt_lang, texts):
+    # Source subword tokens as seen by the first model on the route: texts
+    # are segmented and preprocessed (IndicTrans2 only accepts tagged input)
+    # exactly as translate_batch would before tokenizing
+    hop_src, hop_tgt, model_key = core._get_route(src_lang, tgt_lang)["hops"][0]
+    sentences = [
+        sentence for text in texts
+        for sentence in segment_text(text, core.segment_min_chars, core.max_sentence_chars).sentences
+    ]
+    batch = core._prepare_batch(model_key, [(sentence, hop_src, hop_tgt) for sentence in sentences])
+    try:
+        return int(batch.inputs["attention_mask"].sum())
+    finally:
+        core._release_batch(batch)
+
+
+def _summarize(mode, src_lang, tgt_lang, length, batch_size, texts, tokens, latencies, elapsed):
+    sentences = sum(INPUT_LENGTHS[length] for _ in texts)
+    return {
+        "mode": mode,
+        "source_language": src_lang,
+        "target_language": tgt_lang,
+        "length": length,
+        "batch_size": batch_size,
+        "texts": len(texts),
+        "sentences": sentences,
+        "seconds": round(elapsed, 4),
+        "sentences_per_second": round(sentences / elapsed, 2) if elapsed > 0 else None,
+        "tokens_per_second": round(tokens / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2)
+        },
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+
+def bench_core(core, src_lang, tgt_lang, texts, batch_size, profile, repeats):
+    core.translate_batch(texts[:batch_size], src_lang, tgt_lang, batch_size=batch_size, profile=profile)
+
+    latencies = []
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        for start in range(0, len(texts), batch_size):
+            call_start = time.perf_counter()
+            core.translate_batch(
+                texts[start:start + batch_size], src_lang, tgt_lang, batch_size=batch_size, profile=profile
+            )
+            latencies.append((time.perf_counter() - call_start) * 1000)
+    return latencies, time.perf_counter() - start_time
+
+
+def bench_service(service, src_lang, tgt_lang, texts, concurrency, profile, repeats):
+    service.translate_text(texts[0], src_lang, tgt_lang, profile=profile)
+
+    def timed(text):
+        call_start = time.perf_counter()
+        result = service.translate_text(text, src_lang, tgt_lang, profile=profile)
+        if result.get("status") == "error":
+            raise RuntimeError(result["error"])
+        return (time.perf_counter() - call_start) * 1000
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, texts * repeats))
+    return latencies, time.perf_counter() - start_time
+
+
+def _model_load_report(core):
+    status = core.get_model_status()
+    return {
+        "models": {
+            model["model_key"]: {"load_seconds": model["load_seconds"], "footprint_mb": model["footprint_mb"]}
+            for model in status["models"]
+        },
+        "cold_starts": status.get("cold_starts", {})
+    }
+
+
+def run_benchmark(models_dir="ds_models/translation", pairs=None, lengths=("short", "medium", "long"),
+                  batch_sizes=(1, 8, 32), modes=("core",), corpus_size=32, repeats=1,
+                  profile=DEFAULT_PROFILE, stub=False, inference_backend="pytorch"):
+    core = None
+    service = None
+    if "core" in modes:
+        core = CoreTranslator(models_dir, inference_backend=inference_backend, pivot_cache_entries=0)
+    if "service" in modes:
+        if stub:
+            # The stub is installed after construction, so nothing may load before it
+            os.environ["TRANSLATION_PRELOAD_MODELS"] = ""
+        from translation_service import TranslationService
+        service = TranslationService(models_dir)
+    translators = [t for t in (core, service.core_translator if service else None) if t is not None]
+    if stub:
+        for translator in translators:
+            install_stub_models(translator)
+
+    reference = translators[0]
+    if pairs is None:
+        pairs = [(src, tgt) for src, tgt in reference.routing.direct_pairs() if src in BENCH_SENTENCES]
+
+    # Load every model a pair needs once, timed, before any measurement
+    model_keys = []
+    for src_lang, tgt_lang in pairs:
+        for key in reference._get_route_model_keys(src_lang, tgt_lang):
+            if key not in model_keys:
+                model_keys.append(key)
+    for translator in translators:
+        translator.preload_models(model_keys, warmup=False)
+
+    report = {
+        "created_at": time.time(),
+        "device": reference.device,
+        "inference_backend": reference.inference_backend,
+        "decoding_profile": profile,
+        "stub": stub,
+        "torch_version": torch.__version__,
+        "python_version": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "corpus_size": corpus_size,
+        "repeats": repeats,
+        "model_load": _model_load_report(reference),
+        "results": []
+    }
+
+    for src_lang, tgt_lang in pairs:
+        for length in lengths:
+            texts = build_corpus(src_lang, length, corpus_size)
+            tokens = _count_tokens(reference, src_lang, tgt_lang, texts) * repeats
+            for batch_size in batch_sizes:
+                for mode in modes:
+                    if mode == "core":
+                        latencies, elapsed = bench_core(core, src_lang, tgt_lang, texts, batch_size, profile, repeats)
+                    else:
+                        latencies, elapsed = bench_service(service, src_lang, tgt_lang, texts, batch_size, profile, repeats)
+                    result = _summarize(
+                        mode, src_lang, tgt_lang, length, batch_size, texts * repeats, tokens, latencies, elapsed
+                    )
+                    print(
+                        f"{mode:7} {src_lang}→{tgt_lang} {length:6} batch={batch_size:<3} "
+                        f"{result['sentences_per_second']} sent/s, p95 {result['latency_ms']['p95']} ms"
+                    )
+                    report["results"].append(result)
+
+    report["peak_rss_mb"] = _peak_rss_mb()
+    return report
+
+
+def bench_replica_layout(core, layout, model_key, items, profile, max_batch_size, max_wait_ms):
+    scheduler = MicroBatchScheduler(
+        core._translate_scheduled_batch,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        workers_per_key=layout.replicas,
+        worker_init=layout.init_worker
+    )
+    batch_key = f"{model_key}/{profile}"
+    try:
+        # Warm every replica's thread pool before timing
+        for future in [scheduler.submit(batch_key, item) for item in items[:layout.replicas * max_batch_size]]:
+            future.result()
+
+        start_time = time.perf_counter()
+        futures = [scheduler.submit(batch_key, item) for item in items]
+        for future in futures:
+            future.result()
+        return time.perf_counter() - start_time
+    finally:
+        scheduler.stop()
+
+
+def run_replica_sweep(models_dir="ds_models/translation", pair=("eng_Latn", "hin_Deva"), corpus_size=512,
+                      repeats=1, profile=DEFAULT_PROFILE, stub=False, inference_backend="pytorch",
+                      max_batch_size=16, max_wait_ms=10.0, pin_cpus=False):
+    """
+    Saturate one direct pair's micro-batch queue under each replicas ×
+    threads split of the CPUs and report sentences/sec for each, best first.
+    """
+    core = CoreTranslator(models_dir, inference_backend=inference_backend, pivot_cache_entries=0)
+    if stub:
+        install_stub_models(core)
+
+    src_lang, tgt_lang = pair
+    hops = core._get_route(src_lang, tgt_lang)["hops"]
+    if len(hops) != 1:
+        raise ValueError(f"Replica sweep needs a direct pair, {src_lang} → {tgt_lang} takes {len(hops)} hops")
+    model_key = hops[0][2]
+    core.preload_models([model_key], warmup=False)
+
+    texts = build_corpus(src_lang, "medium", corpus_size) * repeats
+    items = [(text, src_lang, tgt_lang) for text in texts]
+    sentences = len(texts) * INPUT_LENGTHS["medium"]
+
+    results = []
+    for layout in candidate_layouts(pin_cpus=pin_cpus):
+        elapsed = bench_replica_layout(core, layout, model_key, items, profile, max_batch_size, max_wait_ms)
+        result = {
+            **layout.describe(),
+            "seconds": round(elapsed, 4),
+            "sentences_per_second": round(sentences / elapsed, 2) if elapsed > 0 else None
+        }
+        print(
+            f"replicas={layout.replicas:<3} threads={layout.threads_per_replica:<3} "
+            f"{result['sentences_per_second']} sent/s"
+        )
+        results.append(result)
+
+    results.sort(key=lambda result: result["sentences_per_second"] or 0, reverse=True)
+    best = results[0]
+    print(
+        f"Best split: TRANSLATION_REPLICAS={best['replicas']} "
+        f"TRANSLATION_THREADS_PER_REPLICA={best['threads_per_replica']}"
+    )
+    return {
+        "created_at": time.time(),
+        "device": core.device,
+        "inference_backend": core.inference_backend,
+        "decoding_profile": profile,
+        "stub": stub,
+        "cpu_count": os.cpu_count(),
+        "source_language": src_lang,
+        "target_language": tgt_lang,
+        "model_key": model_key,
+        "sentences": sentences,
+        "max_batch_size": max_batch_size,
+        "max_wait_ms": max_wait_ms,
+        "pin_cpus": pin_cpus,
+        "best": best,
+        "results": results
+    }
+
+
+def _parse_pair(value):
+    src_lang, sep, tgt_lang = value.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Expected SRC:TGT, got {value}")
+    return src_lang, tgt_lang
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark translation throughput and latency")
+    parser.add_argument("--models-dir", default="ds_models/translation",
+                        help="Same models directory TranslationService uses")
+    parser.add_argument("--pairs", nargs="+", type=_parse_pair,
+                        help="SRC:TGT pairs, e.g. eng_Latn:hin_Deva (default: every direct pair)")
+    parser.add_argument("--lengths", nargs="+", choices=list(INPUT_LENGTHS), default=list(INPUT_LENGTHS))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--modes", nargs="+", choices=["core", "service"], default=["core"])
+    parser.add_argument("--corpus-size", type=int, default=32, help="Texts per corpus")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--profile", choices=list(DECODING_PROFILES), default=DEFAULT_PROFILE)
+    parser.add_argument("--backend", choices=list(CoreTranslator.INFERENCE_BACKENDS), default="pytorch")
+    parser.add_argument("--stub", action="store_true", help="Use tiny random models (offline, CPU)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--replica-sweep", action="store_true",
+                        help="Find the fastest replicas × threads split for the first pair")
+    parser.add_argument("--pin-cpus", action="store_true", help="Pin replicas to CPUs during the sweep")
+    args = parser.parse_args()
+
+    if args.replica_sweep:
+        report = run_replica_sweep(
+            args.models_dir, (args.pairs or [("eng_Latn", "hin_Deva")])[0], args.corpus_size, args.repeats,
+            args.profile, args.stub, args.backend, max_batch_size=max(args.batch_sizes), pin_cpus=args.pin_cpus
+        )
+    else:
+        report = run_benchmark(
+            args.models_dir, args.pairs, args.lengths, args.batch_sizes, args.modes,
+            args.corpus_size, args.repeats, args.profile, args.stub, args.backend
+        )
+    rendered = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(rendered)
+    else:
+        print(rendered)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Micro-batching for /api/translate-text/
+BATCHING_ENABLED = _env_bool("TRANSLATION_BATCHING_ENABLED", True)
+BATCH_MAX_SIZE = int(os.getenv("TRANSLATION_BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("TRANSLATION_BATCH_MAX_WAIT_MS", "10"))
+
+# Generate replicas per model pair sharing its micro-batch queue, intra-op
+# threads per replica (0 = CPUs / replicas) and whether to pin each replica
+# to its own CPUs. Run `python benchmark.py --replica-sweep` to find the
+# fastest split for a machine; under serve.py keep replicas × threads within
+# each worker's thread budget.
+REPLICAS = int(os.getenv("TRANSLATION_REPLICAS", "1"))
+THREADS_PER_REPLICA = int(os.getenv("TRANSLATION_THREADS_PER_REPLICA", "0"))
+REPLICA_PIN_CPUS = _env_bool("TRANSLATION_REPLICA_PIN_CPUS", False)
+
+# Batched file translation (txt/json/csv); JSON files are streamed and
+# translated this many string values at a time
+FILE_BATCH_SIZE = int(os.getenv("TRANSLATION_FILE_BATCH_SIZE", "32"))
+JSON_STREAM_BATCH_STRINGS = int(os.getenv("TRANSLATION_JSON_STREAM_BATCH_STRINGS", "512"))
+
+# /api/translate-file/ works on the upload and output streams in memory;
+# either one spills to a temporary file (deleted when the request is done)
+# only once it grows past this many bytes
+FILE_SPOOL_MAX_BYTES = int(os.getenv("TRANSLATION_FILE_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# Overlap IndicTrans2 preprocessing, tokenization and decoding with
+# generate for batch and file translation: CPU worker threads (0 disables)
+# and how many batches are prepared ahead of the one generating
+PIPELINE_CPU_WORKERS = int(os.getenv("TRANSLATION_PIPELINE_CPU_WORKERS", "2"))
+PIPELINE_DEPTH = int(os.getenv("TRANSLATION_PIPELINE_DEPTH", "2"))
+
+# CSV files are translated this many rows at a time (unique values per
+# column within a window go to the model together); a file is abandoned
+# once more than CSV_MAX_FAILED_VALUES distinct values fail to translate
+CSV_WINDOW_ROWS = int(os.getenv("TRANSLATION_CSV_WINDOW_ROWS", "1000"))
+CSV_MAX_FAILED_VALUES = int(os.getenv("TRANSLATION_CSV_MAX_FAILED_VALUES", "50"))
+
+# Translation memory (in-process LRU + SQLite)
+TM_ENABLED = _env_bool("TRANSLATION_MEMORY_ENABLED", True)
+TM_DB_PATH = os.getenv("TRANSLATION_MEMORY_DB_PATH", "ds_models/translation/translation_memory.db")
+TM_MAX_MEMORY_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_MEMORY_ENTRIES", "10000"))
+TM_MAX_DISK_ENTRIES = int(os.getenv("TRANSLATION_MEMORY_MAX_DISK_ENTRIES", "1000000"))
+TM_TTL_SECONDS = int(os.getenv("TRANSLATION_MEMORY_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Streaming translate-file
+STREAM_CHUNK_LINES = int(os.getenv("TRANSLATION_STREAM_CHUNK_LINES", "32"))
+
+# Inference executor (bounded queue + backpressure). Workers block on the
+# batch scheduler, so keep max workers at least BATCH_MAX_SIZE × REPLICAS.
+INFERENCE_MAX_WORKERS = int(os.getenv("TRANSLATION_INFERENCE_MAX_WORKERS", "16"))
+INFERENCE_MAX_QUEUE = int(os.getenv("TRANSLATION_INFERENCE_MAX_QUEUE", "64"))
+
+# Model residency: RAM budget for loaded models (0 = unlimited) and model
+# keys to load and warm up at startup, e.g. "en_to_indic,indic_to_en"
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("TRANSLATION_MODEL_MEMORY_BUDGET_MB", "0")) or None
+PRELOAD_MODELS = [key.strip() for key in os.getenv("TRANSLATION_PRELOAD_MODELS", "").split(",") if key.strip()]
+
+# Re-hash every local model file against its manifest at load time; sizes
+# are always checked, full sha256 verification costs a read of the weights
+VERIFY_MODEL_CHECKSUMS = _env_bool("TRANSLATION_VERIFY_MODEL_CHECKSUMS", False)
+
+# Inference backend: "pytorch" (float32/float16), "int8" (dynamic
+# quantization) or "onnx" (ONNX Runtime for OPUS-MT, needs optimum[onnxruntime])
+INFERENCE_BACKEND = os.getenv("TRANSLATION_INFERENCE_BACKEND", "pytorch")
+
+# Sentence segmentation: texts at least SEGMENT_MIN_CHARS long are split
+# into sentences; sentences longer than SEGMENT_MAX_SENTENCE_CHARS are
+# further split at clause punctuation, then at whitespace
+SEGMENT_MIN_CHARS = int(os.getenv("TRANSLATION_SEGMENT_MIN_CHARS", "200"))
+SEGMENT_MAX_SENTENCE_CHARS = int(os.getenv("TRANSLATION_SEGMENT_MAX_SENTENCE_CHARS", "400"))
+
+# Pipelined pivot (source → English → target) for batch and file jobs:
+# in-memory English pivot cache size (0 disables) and how many stage 1
+# batches may wait for stage 2
+PIVOT_CACHE_ENTRIES = int(os.getenv("TRANSLATION_PIVOT_CACHE_ENTRIES", "10000"))
+PIVOT_PIPELINE_DEPTH = int(os.getenv("TRANSLATION_PIVOT_PIPELINE_DEPTH", "2"))
+
+# Routing graph: per-hop cost, in ms per source word like the measured
+# model latency it is added to (so 2.0 makes an extra hop worth 2 ms/word
+# of decode time), and an optional JSON file registering extra models, e.g.
+# {"opus_mt": {"en_to_fr": {"model_id": "Helsinki-NLP/opus-mt-en-fr", "pairs": [["eng_Latn", "fr"]]}}}
+ROUTING_HOP_COST = float(os.getenv("TRANSLATION_ROUTING_HOP_COST", "2.0"))
+EXTRA_MODELS_FILE = os.getenv("TRANSLATION_EXTRA_MODELS_FILE")
+
+# Multi-worker serving (serve.py): worker processes and intra-op threads
+# per worker (0 = cores / workers)
+SERVE_WORKERS = int(os.getenv("TRANSLATION_SERVE_WORKERS", "1"))
+SERVE_THREADS_PER_WORKER = int(os.getenv("TRANSLATION_SERVE_THREADS_PER_WORKER", "0"))
+
+# Asynchronous file translation jobs: SQLite queue and working files, worker
+# threads per process, segments translated between checkpoints, how long a
+# silent worker keeps its job, and how long finished jobs are kept
+JOBS_DB_PATH = os.getenv("TRANSLATION_JOBS_DB_PATH", "translation_jobs/jobs.db")
+JOBS_DIR = os.getenv("TRANSLATION_JOBS_DIR", "translation_jobs")
+JOBS_WORKERS = int(os.getenv("TRANSLATION_JOBS_WORKERS", "1"))
+JOBS_CHUNK_SEGMENTS = int(os.getenv("TRANSLATION_JOBS_CHUNK_SEGMENTS", "128"))
+JOBS_LEASE_SECONDS = float(os.getenv("TRANSLATION_JOBS_LEASE_SECONDS", "600"))
+JOBS_MAX_ATTEMPTS = int(os.getenv("TRANSLATION_JOBS_MAX_ATTEMPTS", "3"))
+JOBS_RETENTION_SECONDS = int(os.getenv("TRANSLATION_JOBS_RETENTION_SECONDS", str(7 * 24 * 3600)))
+
+# Add a per-stage "timings" block to /api/translate-text/ responses.
+# Stage histograms are always exported on /metrics.
+DEBUG_TIMINGS = _env_bool("TRANSLATION_DEBUG_TIMINGS", False)
@@ -1,40 +1,140 @@
 import torch
 import time
-import json
-import csv
-import os
+import threading
+import queue
 from pathlib import Path
-from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+from transformers import AutoTokenizer, StoppingCriteria, StoppingCriteriaList
 from IndicTransToolkit import IndicProcessor
 from model_manager import ModelManager
+from batch_scheduler import MicroBatchScheduler
+from batch_pipeline import BatchPipeline
+from replicas import ReplicaLayout
+from inference_executor import attach_cancel_token, current_cancel_token
+from translation_memory import TranslationMemory, normalize_text
+from model_residency import ModelResidencyManager
+from segmentation import segment_text
+from routing import RoutingGraph
+import instrumentation
+from csv_engine import CsvTranslationEngine
+from json_stream import JsonPathFilter, translate_json
+from file_formats import open_text_reader, open_text_writer
+from decoding_profiles import (
+    DECODING_PROFILES, DEFAULT_PROFILE, ProfileSelector, generation_kwargs, validate_profile
+)
+
+class _PreparedBatch:
+    """A generate batch between prepare and finish."""
+    
+    __slots__ = ("model_key", "model_type", "items", "profile", "model", "tokenizer",
+                 "groups", "processor", "inputs", "timings")
+    
+    def __init__(self, model_key, model_type, items, profile, model, tokenizer):
+        self.model_key = model_key
+        self.model_type = model_type
+        self.items = items
+        self.profile = profile
+        self.model = model
+        self.tokenizer = tokenizer
+        # (src_lang, tgt_lang) -> item indices, for IndicTrans2 pre/postprocessing
+        self.groups = {}
+        self.processor = None
+        self.inputs = None
+        self.timings = instrumentation.BatchTimings(model_key)
+
+class _CancelledCriteria(StoppingCriteria):
+    """Stops generate once the request (or every request in the batch) is abandoned."""
+    
+    def __init__(self, token):
+        self.token = token
+    
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.token.cancelled, dtype=torch.bool, device=input_ids.device)
 
 class CoreTranslator:
-    def __init__(self, models_dir="ds_models"):  
+    # One short sentence per model key, used to warm up preloaded models
+    WARMUP_SAMPLES = {
+        "en_to_indic": ("Hello, how are you?", "eng_Latn", "hin_Deva"),
+        "indic_to_en": ("नमस्ते, आप कैसे हैं?", "hin_Deva", "eng_Latn"),
+        "en_to_zh": ("Hello, how are you?", "eng_Latn", "zh"),
+        "zh_to_en": ("你好，你好吗？", "zh", "eng_Latn")
+    }
+    
+    INFERENCE_BACKENDS = ("pytorch", "int8", "onnx")
+    
+    LANGUAGE_NAMES = {
+        "eng_Latn": "English",
+        "hin_Deva": "Hindi", 
+        "urd_Arab": "Urdu",
+        "zh": "Chinese"
+    }
+    
+    def __init__(self, models_dir="ds_models", file_batch_size=32, model_memory_budget_mb=None,
+                 inference_backend="pytorch", segment_min_chars=200, max_sentence_chars=400,
+                 pivot_cache_entries=10000, pivot_pipeline_depth=2, extra_models=None,
+                 routing_hop_cost=2.0, verify_model_checksums=False, json_stream_batch_strings=512,
+                 csv_window_rows=1000, csv_max_failed_values=50):  
         self.device = self._get_device()
-        self.model_manager = ModelManager(models_dir)  # \
+        self.model_manager = ModelManager(
+            models_dir, extra_models=extra_models, verify_checksums=verify_model_checksums
+        )
+        self.inference_backend = self._resolve_inference_backend(inference_backend)
+        
+        # Loaded IndicTrans2 and OPUS-MT models, LRU-evicted within the budget
+        self.model_residency = ModelResidencyManager(
+            self.model_manager, model_memory_budget_mb, on_load=instrumentation.record_model_load
+        )
+        
+        # IndicTrans2 setup: idle IndicProcessors, one per batch in flight
+        self._ip_pool = queue.SimpleQueue()
+        
+        # Batch size used by translate_batch / file processing
+        self.file_batch_size = file_batch_size
+        
+        # JSON files are streamed; this many string leaves are translated at a time
+        self.json_stream_batch_strings = json_stream_batch_strings
+        
+        # CSV rows read, translated and written per window, and how many
+        # values may fail before the file is abandoned
+        self.csv_window_rows = csv_window_rows
+        self.csv_max_failed_values = csv_max_failed_values
+        
+        # Texts at least this long are translated sentence by sentence
+        self.segment_min_chars = segment_min_chars
+        self.max_sentence_chars = max_sentence_chars
         
-        # IndicTrans2 setup
-        self.ip = IndicProcessor(inference=True)
-        self.indic_models = {}
-        self.indic_tokenizers = {}
+        # Micro-batching is opt-in; see enable_batching()
+        self.batch_scheduler = None
+        self.replica_layout = None
         
-        # OPUS-MT setup
-        self.opus_models = {}
-        self.opus_tokenizers = {}
+        # Overlapping CPU pre/post-processing with generate is opt-in; see enable_pipeline()
+        self.batch_pipeline = None
+        
+        # Translation memory is opt-in; see enable_translation_memory()
+        self.translation_memory = None
+        
+        # Multi-step jobs: English pivot results cached in memory so fan-out to
+        # several targets from one source only translates to English once
+        self.pivot_cache = None
+        if pivot_cache_entries:
+            self.pivot_cache = TranslationMemory(None, max_memory_entries=pivot_cache_entries)
+        self.pivot_pipeline_depth = pivot_pipeline_depth
+        
+        # Measured decode cost per profile, used to honour latency budgets
+        self.profile_selector = ProfileSelector(model_type_fn=self._get_model_type)
+        
+        # Routes between every language pair the known models can reach,
+        # costed by hop count plus measured per-model latency
+        self.routing = RoutingGraph(
+            self.model_manager.iter_model_pairs(),
+            latency_fn=lambda model_key: self.profile_selector.ms_per_word(model_key, DEFAULT_PROFILE),
+            hop_cost=routing_hop_cost
+        )
         
         # Language mappings
         self.supported_languages = {
-            "eng_Latn": "English",
-            "hin_Deva": "Hindi", 
-            "urd_Arab": "Urdu",
-            "zh": "Chinese"
+            lang: self.LANGUAGE_NAMES.get(lang, lang) for lang in self.routing.languages
         }
-        
-        self.direct_pairs = [
-            ("eng_Latn", "hin_Deva"), ("hin_Deva", "eng_Latn"),
-            ("eng_Latn", "urd_Arab"), ("urd_Arab", "eng_Latn"),
-            ("eng_Latn", "zh"), ("zh", "eng_Latn")
-        ]
+        self.direct_pairs = self.routing.direct_pairs()
     
     def _get_device(self):
         if torch.cuda.is_available():
@@ -44,265 +144,928 @@ class CoreTranslator:
         else:
             return "cpu"
     
-    def _load_indictrans_model(self, model_key):
-        if model_key in self.indic_models:
-            return self.indic_models[model_key], self.indic_tokenizers[model_key]
-        
-        cache_dir = self.model_manager.ensure_model_available("indictrans2", model_key)
-        config = self.model_manager.get_model_path("indictrans2", model_key)
-        
-        tokenizer = AutoTokenizer.from_pretrained(
-            config["model_id"], 
-            cache_dir=cache_dir,
-            trust_remote_code=True
-        )
+    def _resolve_inference_backend(self, backend):
+        if backend not in self.INFERENCE_BACKENDS:
+            raise ValueError(
+                f"Unknown inference backend: {backend}. "
+                f"Available backends: {', '.join(self.INFERENCE_BACKENDS)}"
+            )
+        if backend != "pytorch" and self.device != "cpu":
+            print(f"Inference backend '{backend}' is CPU-only, using 'pytorch' on {self.device}")
+            return "pytorch"
+        return backend
+    
+    def _quantize_int8(self, model):
+        # Dynamic int8 quantization of the Linear layers; activations are
+        # quantized on the fly, so no calibration data is needed.
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    
+    def _load_onnx_model(self, model_type, model_key):
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
         
-        dtype = torch.float16 if self.device != "cpu" else torch.float32
-        model = AutoModelForSeq2SeqLM.from_pretrained(
-            config["model_id"],
-            cache_dir=cache_dir,
-            trust_remote_code=True,
-            torch_dtype=dtype
-        ).to(self.device)
+        export_dir = self.model_manager.get_export_dir(model_type, model_key, "onnx")
+        if self.model_manager.is_export_cached(export_dir):
+            return ORTModelForSeq2SeqLM.from_pretrained(export_dir)
         
-        model.eval()
+        cache_dir = self.model_manager.ensure_model_available(model_type, model_key)
+        config = self.model_manager.get_model_path(model_type, model_key)
         
-        self.indic_models[model_key] = model
-        self.indic_tokenizers[model_key] = tokenizer
+        print(f"Exporting {config['model_id']} to ONNX")
+        start_time = time.time()
+        # Export from the local store rather than the hub id so nothing is fetched twice
+        model = ORTModelForSeq2SeqLM.from_pretrained(cache_dir, export=True)
+        model.save_pretrained(export_dir)
+        print(f"ONNX export finished in {time.time() - start_time:.1f}s")
         
-        return model, tokenizer
+        return ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+    
+    def _load_indictrans_model(self, model_key):
+        return self.model_residency.get("indictrans2", model_key, self._load_indictrans_weights)
     
     def _load_opus_model(self, model_key):
-        if model_key in self.opus_models:
-            return self.opus_models[model_key], self.opus_tokenizers[model_key]
+        return self.model_residency.get("opus_mt", model_key, self._load_opus_weights)
+    
+    def _load_indictrans_weights(self, model_key):
+        dtype = torch.float16 if self.device != "cpu" else torch.float32
+        model, tokenizer = self.model_manager.load_pretrained(
+            "indictrans2", model_key, torch_dtype=dtype, device=self.device, trust_remote_code=True
+        )
         
-        cache_dir = self.model_manager.ensure_model_available("opus_mt", model_key)
-        config = self.model_manager.get_model_path("opus_mt", model_key)
+        # IndicTrans2 ships custom modelling code that ONNX export doesn't
+        # cover, so both CPU backends use dynamic int8 for it.
+        if self.inference_backend in ("int8", "onnx"):
+            model = self._quantize_int8(model)
         
-        tokenizer = AutoTokenizer.from_pretrained(config["model_id"], cache_dir=cache_dir)
+        return model, tokenizer
+    
+    def _load_opus_weights(self, model_key):
+        if self.inference_backend == "onnx":
+            try:
+                model = self._load_onnx_model("opus_mt", model_key)
+                cache_dir = self.model_manager.ensure_model_available("opus_mt", model_key)
+                return model, AutoTokenizer.from_pretrained(cache_dir)
+            except ImportError:
+                print("optimum[onnxruntime] is not installed, falling back to int8 for OPUS-MT")
         
         dtype = torch.float16 if self.device != "cpu" else torch.float32
-        model = AutoModelForSeq2SeqLM.from_pretrained(
-            config["model_id"],
-            cache_dir=cache_dir,
-            torch_dtype=dtype
-        ).to(self.device)
-        
-        model.eval()
+        model, tokenizer = self.model_manager.load_pretrained(
+            "opus_mt", model_key, torch_dtype=dtype, device=self.device
+        )
         
-        self.opus_models[model_key] = model
-        self.opus_tokenizers[model_key] = tokenizer
+        if self.inference_backend in ("int8", "onnx"):
+            model = self._quantize_int8(model)
         
         return model, tokenizer
     
+    def preload_models(self, model_keys, warmup=True):
+        """
+        Load the given model keys up front and optionally run one short
+        generate on each so the first real request doesn't pay for it.
+        """
+        for model_key in model_keys:
+            try:
+                model_type = self._get_model_type(model_key)
+            except ValueError:
+                print(f"Skipping preload of unknown model key: {model_key}")
+                continue
+            
+            start_time = time.time()
+            if model_type == "opus_mt":
+                self._load_opus_model(model_key)
+            else:
+                self._load_indictrans_model(model_key)
+            
+            if warmup:
+                sample = self.WARMUP_SAMPLES.get(model_key)
+                if sample is None:
+                    src_lang, tgt_lang = self.model_manager.model_pairs[model_key][0]
+                    sample = ("Hello", src_lang, tgt_lang)
+                self.translate_model_batch(model_key, [sample])
+            
+            print(f"Preloaded {model_key} in {time.time() - start_time:.1f}s")
+    
+    def share_model_memory(self):
+        """
+        Move the weights of every resident PyTorch model into shared memory so
+        worker processes forked afterwards read them instead of copying them.
+        """
+        shared = []
+        if self.device != "cpu":
+            return shared
+        for _, model_key, model in self.model_residency.resident_models():
+            if hasattr(model, "share_memory"):
+                model.share_memory()
+                shared.append(model_key)
+        return shared
+    
+    def get_model_status(self):
+        status = self.model_residency.get_status()
+        status["cold_starts"] = self.model_manager.get_load_stats()
+        return status
+    
     def _is_direct_supported(self, src_lang, tgt_lang):
-        return (src_lang, tgt_lang) in self.direct_pairs
+        return self.routing.has_edge(src_lang, tgt_lang)
+    
+    def is_pair_supported(self, src_lang, tgt_lang):
+        return src_lang == tgt_lang or self._is_multistep_supported(src_lang, tgt_lang)
     
     def _is_multistep_supported(self, src_lang, tgt_lang):
-        if self._is_direct_supported(src_lang, tgt_lang):
-            return True
-        
-        can_src_to_eng = self._is_direct_supported(src_lang, "eng_Latn") or src_lang == "eng_Latn"
-        can_eng_to_tgt = self._is_direct_supported("eng_Latn", tgt_lang) or tgt_lang == "eng_Latn"
-        
-        return can_src_to_eng and can_eng_to_tgt
-    
-    def _translate_indictrans(self, text, src_lang, tgt_lang):
-        model_key = "en_to_indic" if src_lang == "eng_Latn" else "indic_to_en"
-        model, tokenizer = self._load_indictrans_model(model_key)
-        
-        preprocessed = self.ip.preprocess_batch([text], src_lang=src_lang, tgt_lang=tgt_lang)
-        
-        inputs = tokenizer(
-            preprocessed,
-            padding="longest",
-            truncation=True,
-            max_length=256,
-            return_tensors="pt"
-        ).to(self.device)
-        
-        with torch.no_grad():
-            generated_ids = model.generate(
-                **inputs,
-                max_length=256,
-                num_beams=5,
-                length_penalty=0.8,
-                early_stopping=True
-            )
+        return self.routing.route(src_lang, tgt_lang) is not None
+    
+    def _get_route(self, src_lang, tgt_lang):
+        route = self.routing.route(src_lang, tgt_lang)
+        if route is None:
+            raise ValueError(f"Unsupported language pair: {src_lang} → {tgt_lang}")
+        return route
+    
+    def get_routing_table(self):
+        return self.routing.get_table()
+    
+    def _get_model_key(self, src_lang, tgt_lang):
+        return self.routing.model_for(src_lang, tgt_lang)
+    
+    def _get_model_type(self, model_key):
+        return self.model_manager.get_model_type(model_key)
+    
+    def _get_model_id(self, model_key, profile=DEFAULT_PROFILE):
+        model_id = self.model_manager.get_model_path(self._get_model_type(model_key), model_key)["model_id"]
+        # Quantized backends and cheaper profiles produce different output,
+        # so keep their cache entries apart
+        if self.inference_backend != "pytorch":
+            model_id = f"{model_id}@{self.inference_backend}"
+        if profile != DEFAULT_PROFILE:
+            model_id = f"{model_id}#{profile}"
+        return model_id
+    
+    def _get_route_model_keys(self, src_lang, tgt_lang):
+        if src_lang == tgt_lang:
+            return []
+        return [model_key for _, _, model_key in self._get_route(src_lang, tgt_lang)["hops"]]
+    
+    def _acquire_indic_processor(self):
+        # IndicProcessor keeps per-sentence placeholder state between
+        # preprocess_batch and postprocess_batch, so each batch in flight
+        # holds one processor from prepare until it is finished.
+        try:
+            return self._ip_pool.get_nowait()
+        except queue.Empty:
+            return IndicProcessor(inference=True)
+    
+    def _release_batch(self, batch):
+        if batch.processor is not None:
+            self._ip_pool.put(batch.processor)
+            batch.processor = None
+    
+    def _prepare_batch(self, model_key, items, profile=DEFAULT_PROFILE):
+        """
+        CPU side of a generate batch for (text, src_lang, tgt_lang) items that
+        share one model: IndicTrans2 preprocessing and tokenization.
+        """
+        model_type = self._get_model_type(model_key)
+        if model_type == "opus_mt":
+            model, tokenizer = self._load_opus_model(model_key)
+        else:
+            model, tokenizer = self._load_indictrans_model(model_key)
+        batch = _PreparedBatch(model_key, model_type, items, profile, model, tokenizer)
+        timings = batch.timings
         
-        decoded = tokenizer.batch_decode(generated_ids, skip_special_tokens=True)[0]
-        return self.ip.postprocess_batch([decoded], lang=tgt_lang)[0].strip()
-    
-    def _translate_opus(self, text, src_lang, tgt_lang):
-        norm_src = "en" if src_lang == "eng_Latn" else src_lang
-        norm_tgt = "en" if tgt_lang == "eng_Latn" else tgt_lang
-        
-        model_key = "en_to_zh" if norm_src == "en" else "zh_to_en"
-        model, tokenizer = self._load_opus_model(model_key)
-        
-        inputs = tokenizer(
-            text,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=512
-        ).to(self.device)
-        
-        with torch.no_grad():
-            generated_ids = model.generate(
-                **inputs,
-                max_length=512,
-                num_beams=4,
-                length_penalty=0.8,
-                early_stopping=True
-            )
+        if model_type == "opus_mt":
+            with timings.stage("tokenize"):
+                batch.inputs = tokenizer(
+                    [text for text, _, _ in items],
+                    return_tensors="pt",
+                    padding=True,
+                    truncation=True,
+                    max_length=512
+                ).to(self.device)
+            return batch
+        
+        for index, (_, src_lang, tgt_lang) in enumerate(items):
+            batch.groups.setdefault((src_lang, tgt_lang), []).append(index)
+        
+        batch.processor = self._acquire_indic_processor()
+        try:
+            preprocessed = [None] * len(items)
+            with timings.stage("preprocess"):
+                for (src_lang, tgt_lang), indices in batch.groups.items():
+                    sentences = batch.processor.preprocess_batch(
+                        [items[i][0] for i in indices], src_lang=src_lang, tgt_lang=tgt_lang
+                    )
+                    for i, sentence in zip(indices, sentences):
+                        preprocessed[i] = sentence
+            
+            with timings.stage("tokenize"):
+                batch.inputs = tokenizer(
+                    preprocessed,
+                    padding="longest",
+                    truncation=True,
+                    max_length=256,
+                    return_tensors="pt"
+                ).to(self.device)
+        except Exception:
+            self._release_batch(batch)
+            raise
+        return batch
+    
+    def _generate_batch(self, batch):
+        kwargs = generation_kwargs(batch.model_type, batch.profile, batch.inputs["input_ids"].shape[1])
+        token = current_cancel_token()
+        if token is not None:
+            token.raise_if_cancelled()
+            kwargs["stopping_criteria"] = StoppingCriteriaList([_CancelledCriteria(token)])
+        
+        with batch.timings.stage("generate"), torch.no_grad():
+            generated_ids = batch.model.generate(**batch.inputs, **kwargs)
+        
+        # A stopped generate returns truncated output; don't hand that back
+        if token is not None and token.cancelled:
+            instrumentation.record_cancelled_generate(batch.model_key)
+            token.raise_if_cancelled()
+        return generated_ids
+    
+    def _finish_batch(self, batch, generated_ids, error=None):
+        """Decode and postprocess a generated batch; always releases it."""
+        try:
+            if error is not None:
+                raise error
+            timings = batch.timings
+            with timings.stage("decode"):
+                decoded = batch.tokenizer.batch_decode(generated_ids, skip_special_tokens=True)
+            
+            if batch.model_type == "opus_mt":
+                with timings.stage("postprocess"):
+                    results = [sentence.strip() for sentence in decoded]
+            else:
+                # Postprocess in the same group order as preprocessing so the
+                # processor's placeholder queue lines up.
+                results = [None] * len(batch.items)
+                with timings.stage("postprocess"):
+                    for (_, tgt_lang), indices in batch.groups.items():
+                        sentences = batch.processor.postprocess_batch(
+                            [decoded[i] for i in indices], lang=tgt_lang
+                        )
+                        for i, sentence in zip(indices, sentences):
+                            results[i] = sentence.strip()
+        finally:
+            self._release_batch(batch)
+        
+        self._count_tokens(timings, batch.tokenizer, batch.inputs, generated_ids)
+        self._record_batch_cost(batch)
+        return results, timings
+    
+    def _count_tokens(self, timings, tokenizer, inputs, generated_ids):
+        timings.batch_size = int(inputs["input_ids"].shape[0])
+        timings.input_tokens = int(inputs["attention_mask"].sum())
+        pad_token_id = getattr(tokenizer, "pad_token_id", None)
+        if pad_token_id is None:
+            timings.output_tokens = int(generated_ids.numel())
+        else:
+            timings.output_tokens = int((generated_ids != pad_token_id).sum())
+    
+    def _record_batch_cost(self, batch):
+        # Stage time rather than wall time, so pipelined batches that overlap
+        # each other are costed the same as sequential ones
+        self.profile_selector.record(
+            batch.model_key, batch.profile, [text for text, _, _ in batch.items],
+            sum(batch.timings.seconds.values()) * 1000
+        )
+        batch.timings.observe()
+    
+    def _generate_on_replica(self, batch):
+        """
+        Generate on one of the scheduler's replica workers for the batch's
+        model, so batches formed outside the scheduler share its thread
+        budget and concurrency limit instead of all generating at once.
+        """
+        if self.batch_scheduler is None:
+            return self._generate_batch(batch)
+        return self.batch_scheduler.run_exclusive(
+            f"{batch.model_key}/{batch.profile}", self._generate_batch, batch
+        ).result()
+    
+    def _run_model_batch(self, model_key, items, profile=DEFAULT_PROFILE, generate_fn=None):
+        """One generate batch; returns (results, BatchTimings)."""
+        batch = self._prepare_batch(model_key, items, profile)
+        try:
+            generated_ids = (generate_fn or self._generate_batch)(batch)
+        except Exception as e:
+            return self._finish_batch(batch, None, e)
+        return self._finish_batch(batch, generated_ids)
+    
+    def _run_model_batches(self, model_key, batches, profile=DEFAULT_PROFILE, stop_on_error=True):
+        """
+        Several generate batches for one model; returns a (results, error)
+        pair per batch. With the CPU pipeline enabled, the next batches are
+        prepared and finished ones postprocessed while one is generating.
+        """
+        outcomes = []
+        if self.batch_pipeline is None or len(batches) < 2:
+            for items in batches:
+                try:
+                    outcomes.append((self.translate_model_batch(model_key, items, profile), None))
+                except Exception as e:
+                    if stop_on_error:
+                        raise
+                    outcomes.append((None, e))
+            return outcomes
         
-        return tokenizer.decode(generated_ids[0], skip_special_tokens=True).strip()
+        for outcome, error in self.batch_pipeline.run(
+            batches,
+            lambda items: self._prepare_batch(model_key, items, profile),
+            self._generate_on_replica,
+            self._finish_batch,
+            stop_on_error=stop_on_error
+        ):
+            if error is not None:
+                outcomes.append((None, error))
+                continue
+            results, timings = outcome
+            instrumentation.record_batch(timings)
+            outcomes.append((results, None))
+        return outcomes
+    
+    def translate_model_batch(self, model_key, items, profile=DEFAULT_PROFILE):
+        results, timings = self._run_model_batch(model_key, items, profile, self._generate_on_replica)
+        instrumentation.record_batch(timings)
+        return results
+    
+    def _translate_scheduled_batch(self, batch_key, items):
+        # Scheduler keys are "<model_key>/<profile>": only requests that share
+        # both the model and the generate settings can be batched together.
+        model_key, profile = batch_key.split("/")
+        results, timings = self._run_model_batch(model_key, items, profile)
+        # Hand each caller the batch timings too; see translate_direct
+        return [(result, timings) for result in results]
+    
+    def enable_batching(self, max_batch_size=16, max_wait_ms=10.0, replicas=1, threads_per_replica=0,
+                        pin_cpus=False):
+        """
+        Micro-batch concurrent requests. With ``replicas`` > 1 each model pair
+        gets that many generate workers on one shared queue, each limited to
+        ``threads_per_replica`` intra-op threads (0 = CPUs / replicas) and,
+        with ``pin_cpus``, to its own CPUs; see ReplicaLayout.
+        """
+        self.replica_layout = None
+        if replicas > 1 or threads_per_replica or pin_cpus:
+            self.replica_layout = ReplicaLayout(replicas, threads_per_replica, pin_cpus=pin_cpus)
+        self.batch_scheduler = MicroBatchScheduler(
+            self._translate_scheduled_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            workers_per_key=replicas,
+            worker_init=self.replica_layout.init_worker if self.replica_layout else None
+        )
+    
+    def enable_pipeline(self, cpu_workers=2, depth=2):
+        self.batch_pipeline = BatchPipeline(cpu_workers=cpu_workers, depth=depth)
+    
+    def enable_translation_memory(self, db_path, **kwargs):
+        self.translation_memory = TranslationMemory(db_path, **kwargs)
+    
+    def get_translation_memory_stats(self):
+        pivot_cache = self.pivot_cache.get_stats() if self.pivot_cache is not None else None
+        if self.translation_memory is None:
+            return {"enabled": False, "pivot_cache": pivot_cache}
+        return {"enabled": True, **self.translation_memory.get_stats(), "pivot_cache": pivot_cache}
     
-    def translate_direct(self, text, src_lang, tgt_lang):
+    def clear_translation_memory(self):
+        # The pivot cache works without translation memory, so clear it either way
+        if self.pivot_cache is not None:
+            self.pivot_cache.clear()
+        if self.translation_memory is None:
+            return {"enabled": False}
+        self.translation_memory.clear()
+        return {"enabled": True, "status": "cleared"}
+    
+    def get_batching_stats(self):
+        if self.batch_scheduler is None:
+            return {"enabled": False}
+        replicas = self.replica_layout.describe() if self.replica_layout else None
+        return {"enabled": True, **self.batch_scheduler.get_stats(), "replica_layout": replicas}
+    
+    def get_pipeline_stats(self):
+        if self.batch_pipeline is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.batch_pipeline.get_stats()}
+    
+    def get_decoding_profiles(self):
+        return {
+            "default": DEFAULT_PROFILE,
+            "profiles": DECODING_PROFILES,
+            **self.profile_selector.get_stats()
+        }
+    
+    def resolve_profile(self, src_lang, tgt_lang, text, profile=None, latency_budget_ms=None, route=None):
+        """
+        An explicit profile wins; otherwise a latency budget picks the best
+        profile expected to fit, and without either the default is used.
+        """
+        if profile:
+            return validate_profile(profile)
+        if latency_budget_ms:
+            if route is None:
+                model_keys = self._get_route_model_keys(src_lang, tgt_lang)
+            else:
+                model_keys = [model_key for _, _, model_key in route["hops"]]
+            return self.profile_selector.select(model_keys, text, latency_budget_ms)
+        return DEFAULT_PROFILE
+    
+    def translate_direct(self, text, src_lang, tgt_lang, profile=DEFAULT_PROFILE, model_key=None):
         if src_lang == tgt_lang:
             return text
         
         if not text.strip():
             return text
         
-        if "zh" in {src_lang, tgt_lang}:
-            return self._translate_opus(text, src_lang, tgt_lang)
+        model_key = model_key or self._get_model_key(src_lang, tgt_lang)
+        
+        cache_key = None
+        if self.translation_memory is not None:
+            cache_key = self.translation_memory.make_key(
+                text, src_lang, tgt_lang, self._get_model_id(model_key, profile)
+            )
+            cached = self.translation_memory.get(cache_key)
+            instrumentation.record_cache_lookups("translation_memory", int(cached is not None), int(cached is None))
+            if cached is not None:
+                return cached
+        
+        if self.batch_scheduler is not None:
+            translated, timings = self.batch_scheduler.submit(
+                f"{model_key}/{profile}", (text, src_lang, tgt_lang)
+            ).result()
+            instrumentation.record_batch(timings)
         else:
-            return self._translate_indictrans(text, src_lang, tgt_lang)
+            translated = self.translate_model_batch(model_key, [(text, src_lang, tgt_lang)], profile)[0]
+        
+        if cache_key is not None:
+            self.translation_memory.put(cache_key, translated)
+        
+        return translated
+    
+    def translate_multistep(self, text, src_lang, tgt_lang, profile=DEFAULT_PROFILE, route=None):
+        # Follow the cheapest route (or the one already resolved) hop by hop
+        route = route or self._get_route(src_lang, tgt_lang)
+        for hop_src, hop_tgt, model_key in route["hops"]:
+            text = self.translate_direct(text, hop_src, hop_tgt, profile, model_key)
+        return text
     
-    def translate_multistep(self, text, src_lang, tgt_lang):
-        if self._is_direct_supported(src_lang, tgt_lang):
-            return self.translate_direct(text, src_lang, tgt_lang)
+    def translate_with_routing(self, text, src_lang, tgt_lang, profile=None, latency_budget_ms=None,
+                               include_timings=False):
+        if not include_timings:
+            return self._translate_with_routing(text, src_lang, tgt_lang, profile, latency_budget_ms)
         
-        # Step 1: Source → English
-        if src_lang != "eng_Latn":
-            english_text = self.translate_direct(text, src_lang, "eng_Latn")
-        else:
-            english_text = text
+        with instrumentation.collect_timings() as timings:
+            result = self._translate_with_routing(text, src_lang, tgt_lang, profile, latency_budget_ms)
+        result["timings"] = timings.as_dict()
+        return result
+    
+    def _translate_with_routing(self, text, src_lang, tgt_lang, profile, latency_budget_ms):
+        # Resolved once: the periodic route refresh may change the cheapest
+        # route meanwhile, and the response must report the one used
+        route = self._get_route(src_lang, tgt_lang)
+        profile = self.resolve_profile(src_lang, tgt_lang, text, profile, latency_budget_ms, route)
+        start_time = time.time()
         
-        # Step 2: English → Target
-        if tgt_lang != "eng_Latn":
-            return self.translate_direct(english_text, "eng_Latn", tgt_lang)
-        else:
-            return english_text
-    
-    def translate_with_routing(self, text, src_lang, tgt_lang):
-        if self._is_direct_supported(src_lang, tgt_lang):
-            result = self.translate_direct(text, src_lang, tgt_lang)
-            method = "direct"
-        elif self._is_multistep_supported(src_lang, tgt_lang):
-            result = self.translate_multistep(text, src_lang, tgt_lang)
-            method = "multi_step"
+        method = "direct" if len(route["hops"]) == 1 else "multi_step"
+        
+        if len(text) >= self.segment_min_chars:
+            # Long input: translate sentence by sentence in one batch
+            result = self.translate_batch([text], src_lang, tgt_lang, profile=profile, route=route)[0]
         else:
-            raise ValueError(f"Unsupported language pair: {src_lang} → {tgt_lang}")
+            result = self.translate_multistep(text, src_lang, tgt_lang, profile, route)
         
         return {
             "translated_text": result,
             "translation_method": method,
+            "route": [src_lang] + [hop_tgt for _, hop_tgt, _ in route["hops"]],
+            "estimated_cost": round(route["cost"], 3),
             "source_language": src_lang,
             "target_language": tgt_lang,
+            "decoding_profile": profile,
+            "decode_ms": round((time.time() - start_time) * 1000, 2),
             "status": "success"
         }
     
+    def translate_direct_batch(self, texts, src_lang, tgt_lang, batch_size=None, keep_source_on_error=False,
+                               profile=DEFAULT_PROFILE, model_key=None):
+        """
+        Translate a list of texts over a direct pair. Identical segments are
+        translated once, translation memory hits skip the model, and the rest
+        are sorted by length and cut into batches so each generate call pads
+        as little as possible. Results come back in the original order.
+        """
+        if src_lang == tgt_lang:
+            return list(texts)
+        
+        model_key = model_key or self._get_model_key(src_lang, tgt_lang)
+        return self._translate_direct_jobs(
+            model_key, [(texts, src_lang, tgt_lang)], batch_size, keep_source_on_error, profile
+        )[0]
+    
+    def _translate_direct_jobs(self, model_key, jobs, batch_size=None, keep_source_on_error=False,
+                               profile=DEFAULT_PROFILE):
+        """
+        translate_direct_batch() for several (texts, src_lang, tgt_lang) jobs
+        that run on the same model, e.g. English to Hindi and English to Urdu
+        on en_to_indic: their segments share deduplication, length sorting
+        and generate batches. Returns one result list per job.
+        """
+        batch_size = batch_size or self.file_batch_size
+        model_id = self._get_model_id(model_key, profile)
+        results = [list(texts) for texts, _, _ in jobs]
+        
+        # (normalized text, src_lang, tgt_lang) -> (job, position) pairs that share it
+        unique = {}
+        for job_index, (texts, src_lang, tgt_lang) in enumerate(jobs):
+            for i, text in enumerate(texts):
+                if text.strip():
+                    unique.setdefault((normalize_text(text), src_lang, tgt_lang), []).append((job_index, i))
+        
+        pending = []
+        for key, positions in unique.items():
+            if self.translation_memory is not None:
+                cached = self.translation_memory.get(self.translation_memory.make_key(*key, model_id))
+                if cached is not None:
+                    for job_index, i in positions:
+                        results[job_index][i] = cached
+                    continue
+            pending.append(key)
+        
+        if self.translation_memory is not None:
+            instrumentation.record_cache_lookups(
+                "translation_memory", len(unique) - len(pending), len(pending)
+            )
+        
+        pending.sort(key=lambda key: len(key[0]))
+        
+        chunks = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        outcomes = self._run_model_batches(
+            model_key,
+            [
+                [(jobs[unique[key][0][0]][0][unique[key][0][1]], key[1], key[2]) for key in chunk]
+                for chunk in chunks
+            ],
+            profile,
+            stop_on_error=not keep_source_on_error
+        )
+        
+        for chunk, (translated, error) in zip(chunks, outcomes):
+            if error is not None:
+                pairs = sorted({f"{src_lang} → {tgt_lang}" for _, src_lang, tgt_lang in chunk})
+                print(f"Batch of {len(chunk)} segments failed ({', '.join(pairs)}), keeping source text: {error}")
+                continue
+            
+            for key, text in zip(chunk, translated):
+                for job_index, i in unique[key]:
+                    results[job_index][i] = text
+            
+            if self.translation_memory is not None:
+                self.translation_memory.put_many([
+                    (self.translation_memory.make_key(*key, model_id), text)
+                    for key, text in zip(chunk, translated)
+                ])
+        
+        return results
+    
+    def translate_batch(self, texts, src_lang, tgt_lang, batch_size=None, keep_source_on_error=False,
+                        profile=DEFAULT_PROFILE, route=None):
+        """
+        Translate a list of texts over any supported pair. Long texts are
+        split into sentences, all sentences are translated as one batch and
+        each text is reassembled with its original whitespace.
+        """
+        segmentations = [
+            segment_text(text, self.segment_min_chars, self.max_sentence_chars) for text in texts
+        ]
+        sentences = [sentence for segmentation in segmentations for sentence in segmentation.sentences]
+        
+        translated = self._translate_routed_batch(
+            sentences, src_lang, tgt_lang, batch_size, keep_source_on_error, profile, route
+        )
+        
+        results = []
+        position = 0
+        for segmentation in segmentations:
+            count = len(segmentation.pieces)
+            results.append(segmentation.join(translated[position:position + count], tgt_lang))
+            position += count
+        return results
+    
+    def translate_fanout(self, texts, src_lang, tgt_langs, batch_size=None, keep_source_on_error=False,
+                         profile=DEFAULT_PROFILE):
+        """
+        Translate a list of texts from one source into several targets.
+        Texts are segmented once and every target's route is walked hop by
+        hop together: at each step the hops still needed are grouped by
+        model, so targets served by the same model (Hindi and Urdu on
+        en_to_indic) share deduplication and generate batches, and a pivot
+        language several routes pass through is translated into once.
+        Returns {tgt_lang: translations in input order}.
+        """
+        tgt_langs = list(dict.fromkeys(tgt_langs))
+        routes = {tgt_lang: self._get_route_hops(src_lang, tgt_lang) for tgt_lang in tgt_langs}
+        
+        segmentations = [
+            segment_text(text, self.segment_min_chars, self.max_sentence_chars) for text in texts
+        ]
+        sentences = [sentence for segmentation in segmentations for sentence in segmentation.sentences]
+        
+        # Language -> the sentences translated into it
+        translated = {src_lang: sentences}
+        while True:
+            # The next unresolved hop of every route, grouped by model
+            jobs = {}
+            scheduled = set()
+            for hops in routes.values():
+                for hop_src, hop_tgt, model_key in hops:
+                    if hop_tgt not in translated:
+                        if hop_tgt not in scheduled:
+                            jobs.setdefault(model_key, {})[hop_tgt] = hop_src
+                            scheduled.add(hop_tgt)
+                        break
+            if not jobs:
+                break
+            
+            for model_key, hop_pairs in jobs.items():
+                hop_targets = list(hop_pairs)
+                outputs = self._translate_direct_jobs(
+                    model_key,
+                    [(translated[hop_pairs[hop_tgt]], hop_pairs[hop_tgt], hop_tgt) for hop_tgt in hop_targets],
+                    batch_size, keep_source_on_error, profile
+                )
+                translated.update(zip(hop_targets, outputs))
+        
+        results = {}
+        for tgt_lang in tgt_langs:
+            target_sentences = translated[tgt_lang]
+            results[tgt_lang] = []
+            position = 0
+            for segmentation in segmentations:
+                count = len(segmentation.pieces)
+                results[tgt_lang].append(
+                    segmentation.join(target_sentences[position:position + count], tgt_lang)
+                )
+                position += count
+        return results
+    
+    def _get_route_hops(self, src_lang, tgt_lang):
+        if src_lang == tgt_lang:
+            return []
+        return self._get_route(src_lang, tgt_lang)["hops"]
+    
+    def _translate_routed_batch(self, texts, src_lang, tgt_lang, batch_size, keep_source_on_error, profile,
+                                route=None):
+        if src_lang == tgt_lang:
+            return list(texts)
+        
+        hops = (route or self._get_route(src_lang, tgt_lang))["hops"]
+        
+        if len(hops) == 1:
+            return self.translate_direct_batch(
+                texts, src_lang, tgt_lang, batch_size, keep_source_on_error, profile, hops[0][2]
+            )
+        
+        if len(hops) == 2:
+            return self._translate_pivot_pipelined(texts, hops, batch_size, keep_source_on_error, profile)
+        
+        for hop_src, hop_tgt, model_key in hops:
+            texts = self.translate_direct_batch(
+                texts, hop_src, hop_tgt, batch_size, keep_source_on_error, profile, model_key
+            )
+        return texts
+    
+    def _translate_to_pivot(self, texts, src_lang, pivot_lang, batch_size, keep_source_on_error, profile,
+                            model_key):
+        if self.pivot_cache is None:
+            return self.translate_direct_batch(
+                texts, src_lang, pivot_lang, batch_size, keep_source_on_error, profile, model_key
+            )
+        
+        model_id = self._get_model_id(model_key, profile)
+        keys = [self.pivot_cache.make_key(text, src_lang, pivot_lang, model_id) for text in texts]
+        pivot_texts = [self.pivot_cache.get(key) if text.strip() else text for key, text in zip(keys, texts)]
+        
+        misses = [i for i, pivot_text in enumerate(pivot_texts) if pivot_text is None]
+        instrumentation.record_cache_lookups(
+            "pivot", sum(1 for text in texts if text.strip()) - len(misses), len(misses)
+        )
+        if misses:
+            translated = self.translate_direct_batch(
+                [texts[i] for i in misses], src_lang, pivot_lang, batch_size, keep_source_on_error, profile,
+                model_key
+            )
+            for i, pivot_text in zip(misses, translated):
+                pivot_texts[i] = pivot_text
+            self.pivot_cache.put_many([
+                (keys[i], pivot_text) for i, pivot_text in zip(misses, translated) if pivot_text is not texts[i]
+            ])
+        return pivot_texts
+    
+    def _translate_pivot_pipelined(self, texts, hops, batch_size, keep_source_on_error, profile):
+        """
+        Source → pivot → target over a two-hop route with the two stages
+        overlapped: this thread runs stage 1 batch by batch and hands each
+        pivot batch through a bounded queue to a stage 2 thread, so both
+        models are busy at once.
+        """
+        (src_lang, pivot_lang, pivot_model_key), (_, tgt_lang, tgt_model_key) = hops
+        batch_size = batch_size or self.file_batch_size
+        results = list(texts)
+        
+        # Sort globally by length so every stage 1 batch pads as little as possible
+        order = sorted((i for i, text in enumerate(texts) if text.strip()), key=lambda i: len(texts[i]))
+        chunks = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+        
+        if len(chunks) <= 1:
+            pivot_texts = self._translate_to_pivot(
+                texts, src_lang, pivot_lang, batch_size, keep_source_on_error, profile, pivot_model_key
+            )
+            return self.translate_direct_batch(
+                pivot_texts, pivot_lang, tgt_lang, batch_size, keep_source_on_error, profile, tgt_model_key
+            )
+        
+        handoff = queue.Queue(maxsize=self.pivot_pipeline_depth)
+        stage2_errors = []
+        request_timings = instrumentation.active_timings()
+        cancel_token = current_cancel_token()
+        
+        def stage2():
+            with instrumentation.attach_timings(request_timings), attach_cancel_token(cancel_token):
+                run_stage2()
+        
+        def run_stage2():
+            while True:
+                item = handoff.get()
+                if item is None:
+                    return
+                if stage2_errors:
+                    continue
+                chunk, pivot_texts = item
+                try:
+                    translated = self.translate_direct_batch(
+                        pivot_texts, pivot_lang, tgt_lang, batch_size, keep_source_on_error, profile,
+                        tgt_model_key
+                    )
+                    for i, text in zip(chunk, translated):
+                        results[i] = text
+                except Exception as e:
+                    stage2_errors.append(e)
+        
+        worker = threading.Thread(target=stage2, name="pivot-stage2", daemon=True)
+        worker.start()
+        try:
+            for chunk in chunks:
+                if stage2_errors:
+                    break
+                pivot_texts = self._translate_to_pivot(
+                    [texts[i] for i in chunk], src_lang, pivot_lang, batch_size, keep_source_on_error, profile,
+                    pivot_model_key
+                )
+                handoff.put((chunk, pivot_texts))
+        finally:
+            handoff.put(None)
+            worker.join()
+        
+        if stage2_errors:
+            raise stage2_errors[0]
+        return results
+    
+    def translate_lines(self, lines, src_lang, tgt_lang, batch_size=None, profile=DEFAULT_PROFILE):
+        """
+        Translate text-file lines, keeping blank lines as they are.
+        Translated lines always end with a newline.
+        """
+        indices = [i for i, line in enumerate(lines) if line.strip()]
+        translated = self.translate_batch(
+            [lines[i].strip() for i in indices], src_lang, tgt_lang,
+            batch_size=batch_size, profile=profile
+        )
+        
+        translated_lines = list(lines)
+        for i, text in zip(indices, translated):
+            translated_lines[i] = text + "\n"
+        return translated_lines
+    
     def process_file(self, input_path, output_path, src_lang, tgt_lang, **kwargs):
-        file_ext = Path(input_path).suffix.lower()
+        with open(input_path, 'rb') as source, open(output_path, 'wb') as target:
+            result = self.process_stream(
+                source, target, Path(input_path).suffix, src_lang, tgt_lang, **kwargs
+            )
+        return {**result, "input_file": input_path, "output_file": output_path}
+    
+    def process_stream(self, source, target, file_ext, src_lang, tgt_lang, **kwargs):
+        """
+        Translate a txt/json/csv document from binary stream ``source`` into
+        binary stream ``target`` (UTF-8 in and out). Neither stream is closed.
+        """
+        file_ext = file_ext.lower()
+        kwargs["profile"] = validate_profile(kwargs.get("profile") or DEFAULT_PROFILE)
+        if file_ext != ".json" and (kwargs.get("include_paths") or kwargs.get("exclude_paths")):
+            raise ValueError("Path filters only apply to JSON files")
+        if file_ext != ".csv" and (kwargs.get("columns") or kwargs.get("skip_patterns")):
+            raise ValueError("Column selection and skip patterns only apply to CSV files")
         
         if file_ext == ".txt":
-            return self._process_txt_file(input_path, output_path, src_lang, tgt_lang)
+            process = self._process_txt_file
         elif file_ext == ".json":
-            return self._process_json_file(input_path, output_path, src_lang, tgt_lang, **kwargs)
+            process = self._process_json_file
         elif file_ext == ".csv":
-            return self._process_csv_file(input_path, output_path, src_lang, tgt_lang, **kwargs)
+            process = self._process_csv_file
         else:
             raise ValueError(f"Unsupported file format: {file_ext}")
+        # Fail on an unsupported pair before reading anything
+        self._get_route_hops(src_lang, tgt_lang)
+        
+        reader = open_text_reader(source, newline='' if file_ext == ".csv" else None)
+        try:
+            return process(reader, open_text_writer(target), src_lang, tgt_lang, **kwargs)
+        finally:
+            reader.detach()
     
-    def _process_txt_file(self, input_path, output_path, src_lang, tgt_lang):
-        with open(input_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+    def _segments_per_second(self, segments, started_at):
+        elapsed = time.time() - started_at
+        return round(segments / elapsed, 2) if elapsed > 0 else 0.0
+    
+    def _process_txt_file(self, source, target, src_lang, tgt_lang, **kwargs):
+        start_time = time.time()
         
-        translated_lines = []
-        for line in lines:
-            if line.strip():
-                result = self.translate_with_routing(line.strip(), src_lang, tgt_lang)
-                translated_lines.append(result["translated_text"] + "\n")
-            else:
-                translated_lines.append(line)
+        lines = source.readlines()
+        translated_lines = self.translate_lines(
+            lines, src_lang, tgt_lang,
+            batch_size=kwargs.get("batch_size"),
+            profile=kwargs.get("profile", DEFAULT_PROFILE)
+        )
+        lines_processed = len([l for l in lines if l.strip()])
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.writelines(translated_lines)
+        target.writelines(translated_lines)
         
         return {
             "status": "success",
-            "input_file": input_path,
-            "output_file": output_path,
-            "lines_processed": len([l for l in lines if l.strip()])
+            "lines_processed": lines_processed,
+            "decoding_profile": kwargs.get("profile", DEFAULT_PROFILE),
+            "segments_per_second": self._segments_per_second(lines_processed, start_time)
         }
     
-    def _process_json_file(self, input_path, output_path, src_lang, tgt_lang, **kwargs):
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        fields_translated = 0
-        
-        def translate_recursive(obj):
-            nonlocal fields_translated
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    if isinstance(value, str) and value.strip():
-                        result = self.translate_with_routing(value, src_lang, tgt_lang)
-                        obj[key] = result["translated_text"]
-                        fields_translated += 1
-                    elif isinstance(value, (dict, list)):
-                        translate_recursive(value)
-            elif isinstance(obj, list):
-                for item in obj:
-                    translate_recursive(item)
+    def _process_json_file(self, source, target, src_lang, tgt_lang, **kwargs):
+        """
+        Stream the document through json_stream: string leaves accepted by
+        the include/exclude path filters are translated in batches of
+        json_stream_batch_strings while the output is written as it goes.
+        """
+        start_time = time.time()
         
-        translate_recursive(data)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        path_filter = JsonPathFilter(kwargs.get("include_paths"), kwargs.get("exclude_paths"))
+        stats = translate_json(
+            source, target,
+            lambda texts: self.translate_batch(
+                texts, src_lang, tgt_lang,
+                batch_size=kwargs.get("batch_size"),
+                profile=kwargs.get("profile", DEFAULT_PROFILE)
+            ),
+            batch_strings=self.json_stream_batch_strings,
+            path_filter=path_filter
+        )
         
         return {
             "status": "success",
-            "input_file": input_path,
-            "output_file": output_path,
-            "fields_translated": fields_translated
+            "fields_translated": stats["strings_translated"],
+            "fields_skipped": stats["strings_skipped"],
+            "decoding_profile": kwargs.get("profile", DEFAULT_PROFILE),
+            "segments_per_second": self._segments_per_second(stats["strings_translated"], start_time)
         }
     
-    def _process_csv_file(self, input_path, output_path, src_lang, tgt_lang, **kwargs):
-        translated_rows = []
-        cells_translated = 0
+    def _process_csv_file(self, source, target, src_lang, tgt_lang, **kwargs):
+        """
+        Translate the requested columns through CsvTranslationEngine, which
+        skips numeric/pattern cells, translates each column's unique values
+        once and writes rows out window by window.
+        """
+        start_time = time.time()
         
-        with open(input_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            headers = reader.fieldnames
-            
-            for row in reader:
-                translated_row = row.copy()
-                for column, value in row.items():
-                    if value and value.strip():
-                        try:
-                            result = self.translate_with_routing(value, src_lang, tgt_lang)
-                            translated_row[column] = result["translated_text"]
-                            cells_translated += 1
-                        except:
-                            translated_row[column] = value
-                
-                translated_rows.append(translated_row)
-        
-        with open(output_path, 'w', encoding='utf-8', newline='') as f:
-            if translated_rows:
-                writer = csv.DictWriter(f, fieldnames=headers)
-                writer.writeheader()
-                writer.writerows(translated_rows)
+        engine = CsvTranslationEngine(
+            lambda texts: self.translate_batch(
+                texts, src_lang, tgt_lang,
+                batch_size=kwargs.get("batch_size"),
+                profile=kwargs.get("profile", DEFAULT_PROFILE)
+            ),
+            columns=kwargs.get("columns"),
+            skip_patterns=kwargs.get("skip_patterns"),
+            window_rows=self.csv_window_rows,
+            max_failed_values=self.csv_max_failed_values
+        )
+        report = engine.translate(source, target)
         
+        columns = report["columns"]
+        cells_translated = sum(stats["translated"] for stats in columns.values())
+        unique_values = sum(stats["unique_values"] for stats in columns.values())
         return {
             "status": "success",
-            "input_file": input_path,
-            "output_file": output_path,
-            "cells_translated": cells_translated
+            "rows_processed": report["rows"],
+            "cells_translated": cells_translated,
+            "cells_failed": sum(stats["failed"] for stats in columns.values()),
+            "columns": columns,
+            "decoding_profile": kwargs.get("profile", DEFAULT_PROFILE),
+            "segments_per_second": self._segments_per_second(unique_values, start_time)
         }
     
     def get_supported_languages(self):
@@ -313,19 +1076,14 @@ class CoreTranslator:
         }
     
     def get_available_targets(self, src_lang, include_multistep=True):
-        if include_multistep:
-            available = []
-            for lang in self.supported_languages.keys():
-                if lang != src_lang and self._is_multistep_supported(src_lang, lang):
-                    available.append(lang)
-            return available
-        else:
-            return [tgt for src, tgt in self.direct_pairs if src == src_lang]
+        return self.routing.targets_from(src_lang, include_multistep)
     
     def get_system_info(self):
         return {
             "device": self.device,
+            "inference_backend": self.inference_backend,
             "translation_systems": ["IndicTrans2", "OPUS-MT"],
+            "resident_models": self.model_residency.get_status()["models"],
             "direct_pairs": self.direct_pairs,
             "multistep_available": True
         }
\ No newline at end of file
@@ -0,0 +1,197 @@
+import csv
+import re
+from collections import OrderedDict
+
+# Cells matching any of these (in full) are copied through untranslated
+DEFAULT_SKIP_PATTERNS = (
+    r"[+\-]?[\d.,\s]*\d[\d.,\s]*(?:[eE][+\-]?\d+)?%?",  # numbers, amounts, percentages, 1e3
+    r"[\W_]+",                                          # punctuation/symbols only: "-", "—"
+    r"(?:https?|ftp)://\S+|www\.\S+",                  # URLs
+    r"[^@\s]+@[^@\s]+\.[A-Za-z]{2,}",                  # e-mail addresses
+)
+
+
+class CsvCellFilter:
+    """
+    Which cells of a CSV file get translated: those in ``columns`` (all
+    columns when None) that aren't blank and don't fully match a skip
+    pattern. Shared by translate-file and the background jobs queue.
+    """
+
+    def __init__(self, columns=None, skip_patterns=None):
+        self.columns = list(columns) if columns else None
+        try:
+            self.skip_patterns = [
+                re.compile(pattern) for pattern in (*DEFAULT_SKIP_PATTERNS, *(skip_patterns or []))
+            ]
+        except re.error as e:
+            raise ValueError(f"Invalid skip pattern: {e}")
+
+    def should_skip(self, value):
+        stripped = value.strip()
+        return any(pattern.fullmatch(stripped) for pattern in self.skip_patterns)
+
+    def resolve_columns(self, headers):
+        if self.columns is None:
+            return list(range(len(headers)))
+        missing = [column for column in self.columns if column not in headers]
+        if missing:
+            raise ValueError(f"Unknown CSV columns: {', '.join(missing)}")
+        return [index for index, header in enumerate(headers) if header in self.columns]
+
+    def translatable(self, value):
+        return bool(value.strip()) and not self.should_skip(value)
+
+
+class CsvTranslationError(RuntimeError):
+    """Raised when a CSV file is abandoned instead of translated cell by cell."""
+
+
+class CsvTranslationEngine:
+    """
+    Column-aware CSV translation that streams rows through in windows.
+
+    Cells are picked by a CsvCellFilter (``columns``, ``skip_patterns``)
+    and the rest are copied as-is. Each window of ``window_rows`` rows is
+    scanned for values not yet translated in their column, the unique ones
+    are translated in one ``translate_fn`` call, and the window is written
+    out before the next one is read. Translations are
+    remembered per column (up to ``cache_entries`` per column) so repeated
+    values across the file are translated once. A failing batch is split in
+    half until the failing values are isolated; those cells keep their
+    source text and are counted as failures for their column. Once more
+    than ``max_failed_values`` values have failed the whole file is
+    abandoned with CsvTranslationError.
+    """
+
+    def __init__(self, translate_fn, columns=None, skip_patterns=None, window_rows=1000,
+                 cache_entries=100000, max_errors_per_column=5, max_failed_values=50):
+        self.translate_fn = translate_fn
+        self.cell_filter = CsvCellFilter(columns, skip_patterns)
+        self.window_rows = window_rows
+        self.cache_entries = cache_entries
+        self.max_errors_per_column = max_errors_per_column
+        self.max_failed_values = max_failed_values
+        self._failed_values = 0
+
+    def translate_values(self, values):
+        """
+        Translate a list of values with the same bisect-and-give-up handling
+        as translate(); values that fail keep their source text.
+        """
+        translations = self._translate_unique(list(values), [])
+        return [value if translation is None else translation for value, translation in zip(values, translations)]
+
+    def _translate_unique(self, values, failures):
+        """Translate values, bisecting failed batches; failed values map to None."""
+        if not values:
+            return []
+        try:
+            return list(self.translate_fn(values))
+        except Exception as e:
+            if len(values) == 1:
+                failures.append((values[0], e))
+                # A failure that isn't about particular values (a model that
+                # won't load) fails every value; stop before retrying them all
+                self._failed_values += 1
+                if self._failed_values > self.max_failed_values:
+                    raise CsvTranslationError(
+                        f"Gave up after {self._failed_values} values failed to translate: {e}"
+                    ) from e
+                return [None]
+        middle = len(values) // 2
+        return (
+            self._translate_unique(values[:middle], failures)
+            + self._translate_unique(values[middle:], failures)
+        )
+
+    def translate(self, source, target):
+        """
+        Read CSV text from ``source`` and write the translated CSV to
+        ``target`` (both text file objects). Returns the per-column report.
+        """
+        reader = csv.reader(source)
+        writer = csv.writer(target)
+        self._failed_values = 0
+
+        headers = next(reader, None)
+        if headers is None:
+            return {"rows": 0, "columns": {}}
+        writer.writerow(headers)
+
+        column_indices = self.cell_filter.resolve_columns(headers)
+        caches = {index: OrderedDict() for index in column_indices}
+        report = {
+            headers[index]: {
+                "cells": 0, "translated": 0, "skipped": 0, "deduplicated": 0,
+                "unique_values": 0, "failed": 0, "errors": []
+            }
+            for index in column_indices
+        }
+        rows_written = 0
+
+        while True:
+            window = []
+            for row in reader:
+                window.append(row)
+                if len(window) >= self.window_rows:
+                    break
+            if not window:
+                break
+
+            # (column index, value) -> translation for this window, and the
+            # pairs still to translate, in first-seen order
+            resolved = {}
+            needed = OrderedDict()
+            for row in window:
+                for index in column_indices:
+                    if index >= len(row) or not row[index].strip():
+                        continue
+                    stats = report[headers[index]]
+                    stats["cells"] += 1
+                    value = row[index]
+                    if self.cell_filter.should_skip(value):
+                        stats["skipped"] += 1
+                    elif (index, value) in resolved or (index, value) in needed:
+                        stats["deduplicated"] += 1
+                    elif value in caches[index]:
+                        caches[index].move_to_end(value)
+                        resolved[(index, value)] = caches[index][value]
+                        stats["deduplicated"] += 1
+                    else:
+                        needed[(index, value)] = None
+
+            failures = []
+            keys = list(needed)
+            translations = self._translate_unique([value for _, value in keys], failures)
+            failed_values = {value: error for value, error in failures}
+            failed_keys = set()
+            for (index, value), translation in zip(keys, translations):
+                stats = report[headers[index]]
+                stats["unique_values"] += 1
+                if translation is None:
+                    failed_keys.add((index, value))
+                    if len(stats["errors"]) < self.max_errors_per_column:
+                        stats["errors"].append({"value": value, "error": str(failed_values[value])})
+                    continue
+                resolved[(index, value)] = translation
+                cache = caches[index]
+                cache[value] = translation
+                if len(cache) > self.cache_entries:
+                    cache.popitem(last=False)
+
+            for row in window:
+                translated_row = list(row)
+                for index in column_indices:
+                    if index >= len(row):
+                        continue
+                    translation = resolved.get((index, row[index]))
+                    if translation is not None:
+                        translated_row[index] = translation
+                        report[headers[index]]["translated"] += 1
+                    elif (index, row[index]) in failed_keys:
+                        report[headers[index]]["failed"] += 1
+                writer.writerow(translated_row)
+            rows_written += len(window)
+
+        return {"rows": rows_written, "columns": report}
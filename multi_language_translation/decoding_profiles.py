@@ -0,0 +1,131 @@
+import threading
+
+DEFAULT_PROFILE = "quality"
+
+# Generation defaults per model family, used as-is by the "quality" profile
+MODEL_DEFAULTS = {
+    "indictrans2": {"max_length": 256, "num_beams": 5},
+    "opus_mt": {"max_length": 512, "num_beams": 4}
+}
+
+# num_beams=None keeps the family default; max_length_ratio=None keeps the
+# family max_length, otherwise max_length = input_tokens * ratio + padding
+# (capped at the family max_length).
+DECODING_PROFILES = {
+    "fast": {"num_beams": 1, "max_length_ratio": 1.5, "max_length_padding": 10},
+    "balanced": {"num_beams": 2, "max_length_ratio": 2.0, "max_length_padding": 16},
+    "quality": {"num_beams": None, "max_length_ratio": None, "max_length_padding": 0}
+}
+
+# Highest quality first; the latency budget picks the first that fits
+PROFILE_PREFERENCE = ["quality", "balanced", "fast"]
+
+
+def validate_profile(profile):
+    if profile not in DECODING_PROFILES:
+        raise ValueError(
+            f"Unknown decoding profile: {profile}. "
+            f"Available profiles: {', '.join(DECODING_PROFILES.keys())}"
+        )
+    return profile
+
+
+def generation_kwargs(model_type, profile, input_length):
+    defaults = MODEL_DEFAULTS[model_type]
+    settings = DECODING_PROFILES[profile]
+
+    num_beams = settings["num_beams"] or defaults["num_beams"]
+    max_length = defaults["max_length"]
+    if settings["max_length_ratio"] is not None:
+        max_length = min(
+            max_length,
+            int(input_length * settings["max_length_ratio"]) + settings["max_length_padding"]
+        )
+
+    kwargs = {"max_length": max_length, "num_beams": num_beams}
+    if num_beams > 1:
+        kwargs.update(length_penalty=0.8, early_stopping=True)
+    return kwargs
+
+
+class ProfileSelector:
+    """
+    Picks the best decoding profile that fits a latency budget.
+
+    Keeps an exponentially weighted moving average of decode milliseconds per
+    source word for each (model_key, profile), updated from real batches.
+    Only the profile that runs gets measured, so a profile with no samples
+    yet is estimated from a measured profile of the same model, scaled by
+    their beam counts (``model_type_fn`` maps a model key to its family for
+    the "quality" beam count). A model with no samples at all runs the
+    default profile, which measures it.
+    """
+
+    def __init__(self, smoothing=0.2, model_type_fn=None):
+        self.smoothing = smoothing
+        self.model_type_fn = model_type_fn
+        self._ms_per_word = {}
+        self._lock = threading.Lock()
+
+    def _num_beams(self, model_key, profile):
+        num_beams = DECODING_PROFILES[profile]["num_beams"]
+        if num_beams is not None:
+            return num_beams
+        model_type = self.model_type_fn(model_key) if self.model_type_fn else None
+        if model_type in MODEL_DEFAULTS:
+            return MODEL_DEFAULTS[model_type]["num_beams"]
+        return max(defaults["num_beams"] for defaults in MODEL_DEFAULTS.values())
+
+    def _cost(self, model_key, profile):
+        # Caller holds the lock
+        cost = self._ms_per_word.get((model_key, profile))
+        if cost is not None:
+            return cost
+        for measured_profile in PROFILE_PREFERENCE:
+            measured = self._ms_per_word.get((model_key, measured_profile))
+            if measured is not None:
+                return measured * self._num_beams(model_key, profile) / self._num_beams(model_key, measured_profile)
+        return None
+
+    @staticmethod
+    def count_words(texts):
+        return sum(len(text.split()) + 1 for text in texts)
+
+    def record(self, model_key, profile, texts, elapsed_ms):
+        sample = elapsed_ms / max(1, self.count_words(texts))
+        key = (model_key, profile)
+        with self._lock:
+            previous = self._ms_per_word.get(key)
+            if previous is None:
+                self._ms_per_word[key] = sample
+            else:
+                self._ms_per_word[key] = previous + self.smoothing * (sample - previous)
+
+    def ms_per_word(self, model_key, profile):
+        with self._lock:
+            return self._ms_per_word.get((model_key, profile))
+
+    def estimate_ms(self, model_keys, profile, text):
+        words = self.count_words([text])
+        with self._lock:
+            costs = [self._cost(model_key, profile) for model_key in model_keys]
+        if any(cost is None for cost in costs):
+            return None
+        return sum(costs) * words
+
+    def select(self, model_keys, text, latency_budget_ms):
+        for profile in PROFILE_PREFERENCE:
+            estimate = self.estimate_ms(model_keys, profile, text)
+            if estimate is None:
+                # A model on the route hasn't been measured under any profile
+                return DEFAULT_PROFILE
+            if estimate <= latency_budget_ms:
+                return profile
+        return PROFILE_PREFERENCE[-1]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = {}
+            for (model_key, profile), cost in self._ms_per_word.items():
+                stats.setdefault(model_key, {})[profile] = round(cost, 3)
+            return {"ms_per_word": stats}
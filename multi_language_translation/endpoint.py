@@ -1,62 +1,399 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from translation_service import TranslationService
+from inference_executor import BoundedInferenceExecutor, QueueFullError, RequestCancelledError
+from job_queue import JobNotFoundError, TranslationJobQueue
+from decoding_profiles import DECODING_PROFILES
 from pathlib import Path
-import shutil
-import uuid
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.formparsers import MultiPartParser
+from typing import List, Optional
+from urllib.parse import quote
+import codecs
+import json
+import logging
+import tempfile
+import config
+import instrumentation
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 translator = TranslationService()
+inference_executor = BoundedInferenceExecutor(
+    max_workers=config.INFERENCE_MAX_WORKERS,
+    max_queue=config.INFERENCE_MAX_QUEUE,
+    name="translation"
+)
+
+# Uploads are kept in memory up to this size before starlette spills them to a temp file
+MultiPartParser.spool_max_size = config.FILE_SPOOL_MAX_BYTES
+
+FILE_MEDIA_TYPES = {
+    ".txt": "text/plain; charset=utf-8",
+    ".json": "application/json",
+    ".csv": "text/csv; charset=utf-8"
+}
+FILE_RESPONSE_CHUNK_BYTES = 64 * 1024
+
+job_queue = TranslationJobQueue(
+    translator,
+    config.JOBS_DB_PATH,
+    config.JOBS_DIR,
+    workers=config.JOBS_WORKERS,
+    chunk_segments=config.JOBS_CHUNK_SEGMENTS,
+    lease_seconds=config.JOBS_LEASE_SECONDS,
+    max_attempts=config.JOBS_MAX_ATTEMPTS,
+    retention_seconds=config.JOBS_RETENTION_SECONDS,
+    csv_max_failed_values=config.CSV_MAX_FAILED_VALUES
+)
 
-UPLOAD_DIR = Path("input_files")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+
+@router.on_event("startup")
+async def start_job_workers():
+    # Started here rather than at import so serve.py workers start their own after fork
+    job_queue.start()
+
+
+@router.on_event("shutdown")
+async def stop_job_workers():
+    job_queue.stop()
+
+
+async def _run_inference(fn, *args, **kwargs):
+    try:
+        return await inference_executor.run(fn, *args, **kwargs)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+async def _run_cancellable_inference(request: Request, endpoint: str, fn, *args, **kwargs):
+    """_run_inference() that stops the work once the client disconnects."""
+    try:
+        return await inference_executor.run_cancellable(request, fn, *args, **kwargs)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except RequestCancelledError as e:
+        instrumentation.record_cancelled_request(endpoint)
+        # Nobody is listening any more; 499 is what the access log shows
+        raise HTTPException(status_code=499, detail=str(e))
 
 
 @router.post("/translate-text/")
 async def translate_text(
+    request: Request,
     text: str = Form(...),
     src_lang: str = Form(...),
-    tgt_lang: str = Form(...)
+    tgt_lang: str = Form(...),
+    profile: Optional[str] = Form(None),
+    latency_budget_ms: Optional[float] = Form(None)
 ):
-    result = translator.translate_text(text, src_lang, tgt_lang)
+    # Workers block on the batch scheduler, so concurrent requests can meet there
+    result = await _run_cancellable_inference(
+        request, "translate-text",
+        translator.translate_text, text, src_lang, tgt_lang,
+        profile=profile, latency_budget_ms=latency_budget_ms,
+        include_timings=config.DEBUG_TIMINGS
+    )
     if result.get("status") == "error":
         raise HTTPException(status_code=400, detail=result["error"])
     return result
+
+@router.post("/translate-multi/")
+async def translate_multi(
+    request: Request,
+    text: List[str] = Form(...),
+    src_lang: str = Form(...),
+    tgt_langs: List[str] = Form(...),
+    profile: Optional[str] = Form(None),
+    batch_size: Optional[int] = Form(None)
+):
+    """
+    Translate one source text (repeat text for a batch) into every language
+    in tgt_langs (repeatable) in one call. Targets served by the same model
+    share its generate batches; translations come back per target language,
+    one per input text.
+    """
+    if batch_size is not None and batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be at least 1")
+    result = await _run_cancellable_inference(
+        request, "translate-multi",
+        translator.translate_fanout, text, src_lang, tgt_langs,
+        profile=profile, batch_size=batch_size
+    )
+    if result.get("status") == "error":
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
 @router.post("/translate-file/")
 async def translate_file(
     file: UploadFile = File(...),
     src_lang: str = Form(...),
-    tgt_lang: str = Form(...)
+    tgt_lang: str = Form(...),
+    batch_size: Optional[int] = Form(None),
+    profile: Optional[str] = Form(None),
+    include_paths: Optional[List[str]] = Form(None),
+    exclude_paths: Optional[List[str]] = Form(None),
+    columns: Optional[List[str]] = Form(None),
+    skip_patterns: Optional[List[str]] = Form(None)
 ):
-    input_filename = f"{uuid.uuid4().hex}_{file.filename}"
-    input_path = UPLOAD_DIR / input_filename
-    output_path = input_path.with_stem(input_path.stem + "_translated")
+    """
+    Translate a txt/json/csv upload and stream back the translated file in
+    the same format. For JSON, include_paths / exclude_paths (repeatable,
+    e.g. "$.items[*].title", "$..id") limit which string values are
+    translated. For CSV, columns (repeatable) picks the columns to translate
+    and skip_patterns adds regexes for cells to leave alone on top of
+    numbers, URLs and e-mail addresses.
+    """
+    filename = Path(file.filename or "")
+    file_ext = filename.suffix.lower()
+    if file_ext not in FILE_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported file format: {file_ext or file.filename}")
+    if batch_size is not None and batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be at least 1")
 
+    # Read straight from the upload spool; the output stays in memory until
+    # it outgrows FILE_SPOOL_MAX_BYTES
+    output = tempfile.SpooledTemporaryFile(max_size=config.FILE_SPOOL_MAX_BYTES)
     try:
-        with open(input_path, "wb") as f:
-            shutil.copyfileobj(file.file, f)
-
-        result = translator.translate_file(str(input_path), str(output_path), src_lang, tgt_lang)
+        result = await _run_inference(
+            translator.translate_stream,
+            file.file, output, file_ext, src_lang, tgt_lang,
+            batch_size=batch_size, profile=profile,
+            include_paths=include_paths, exclude_paths=exclude_paths,
+            columns=columns, skip_patterns=skip_patterns
+        )
         if result.get("status") == "error":
             raise HTTPException(status_code=400, detail=result["error"])
-
-        with open(output_path, "r", encoding="utf-8") as f:
-            translated_text = f.read()
-
-        return {"translated_text": translated_text}
-
+        size = output.tell()
+    except HTTPException:
+        output.close()
+        raise
     except Exception as e:
+        output.close()
         raise HTTPException(status_code=500, detail=f"Translation failed: {e}")
 
+    output_name = f"{filename.stem}_translated{file_ext}"
+    quoted_name = quote(output_name)
+    if quoted_name == output_name:
+        content_disposition = f'attachment; filename="{output_name}"'
+    else:
+        content_disposition = f"attachment; filename*=utf-8''{quoted_name}"
+
+    return StreamingResponse(
+        _iter_spooled(output),
+        media_type=FILE_MEDIA_TYPES[file_ext],
+        headers={"Content-Disposition": content_disposition, "Content-Length": str(size)},
+        background=BackgroundTask(output.close)
+    )
+
+def _iter_spooled(spool):
+    try:
+        spool.seek(0)
+        while True:
+            chunk = spool.read(FILE_RESPONSE_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
     finally:
+        spool.close()
+
+async def _iter_body_lines(request: Request):
+    """
+    Yield decoded lines from the raw request body as it arrives,
+    holding at most one partial line in memory.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in request.stream():
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+@router.post("/translate-file/stream/")
+async def translate_file_stream(
+    request: Request,
+    src_lang: str,
+    tgt_lang: str,
+    output_format: str = "text",
+    chunk_lines: Optional[int] = None,
+    profile: Optional[str] = None
+):
+    """
+    Translate a plain-text document sent as the raw request body, chunk by
+    chunk, streaming the output back as text/plain or NDJSON. A failure
+    part-way through ends NDJSON output with an error record and aborts
+    text/plain output, so a truncated document never looks complete.
+    """
+    if output_format not in ("text", "ndjson"):
+        raise HTTPException(status_code=400, detail="output_format must be 'text' or 'ndjson'")
+    if not translator.is_pair_supported(src_lang, tgt_lang):
+        raise HTTPException(status_code=400, detail=f"Unsupported language pair: {src_lang} → {tgt_lang}")
+
+    if profile is not None and profile not in DECODING_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown decoding profile: {profile}")
+
+    chunk_lines = chunk_lines or config.STREAM_CHUNK_LINES
+
+    def render(lines, translated, first_line_number):
+        if output_format == "text":
+            return "".join(translated)
+        records = [
+            json.dumps({
+                "line": first_line_number + offset,
+                "source": source.rstrip("\n"),
+                "translated_text": target.rstrip("\n")
+            }, ensure_ascii=False) + "\n"
+            for offset, (source, target) in enumerate(zip(lines, translated))
+        ]
+        return "".join(records)
+
+    async def generate():
+        line_number = 1
+        lines = []
         try:
-            if input_path.exists():
-                input_path.unlink()
-            if output_path.exists():
-                output_path.unlink()
-        except Exception:
-            pass
+            async for line in _iter_body_lines(request):
+                lines.append(line)
+                if len(lines) >= chunk_lines:
+                    translated = await _run_inference(
+                        translator.translate_lines, lines, src_lang, tgt_lang, profile=profile
+                    )
+                    yield render(lines, translated, line_number)
+                    line_number += len(lines)
+                    lines = []
+            if lines:
+                translated = await _run_inference(
+                    translator.translate_lines, lines, src_lang, tgt_lang, profile=profile
+                )
+                yield render(lines, translated, line_number)
+                line_number += len(lines)
+            if output_format == "ndjson":
+                yield json.dumps({"status": "success", "lines_processed": line_number - 1}) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming translation failed at line {line_number}: {e}")
+            if output_format == "ndjson":
+                yield json.dumps({"status": "error", "error": str(e), "line": line_number}) + "\n"
+            else:
+                # The 200 is already sent and plain text has no room for an
+                # error record; abort the response so the client sees an
+                # incomplete body rather than a short document
+                raise
+
+    media_type = "application/x-ndjson" if output_format == "ndjson" else "text/plain; charset=utf-8"
+    return StreamingResponse(generate(), media_type=media_type)
+
+@router.post("/jobs/", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    src_lang: str = Form(...),
+    tgt_lang: str = Form(...),
+    batch_size: Optional[int] = Form(None),
+    profile: Optional[str] = Form(None),
+    include_paths: Optional[List[str]] = Form(None),
+    exclude_paths: Optional[List[str]] = Form(None),
+    columns: Optional[List[str]] = Form(None),
+    skip_patterns: Optional[List[str]] = Form(None)
+):
+    """
+    Queue a txt/json/csv file for background translation. Poll
+    /jobs/{job_id} for progress and fetch /jobs/{job_id}/result when done.
+    Takes the same path, column and skip-pattern options as translate-file.
+    """
+    if not translator.is_pair_supported(src_lang, tgt_lang):
+        raise HTTPException(status_code=400, detail=f"Unsupported language pair: {src_lang} → {tgt_lang}")
+    if profile is not None and profile not in DECODING_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown decoding profile: {profile}")
+    if batch_size is not None and batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be at least 1")
+
+    try:
+        # Copying the upload to the jobs directory is blocking file I/O
+        return await run_in_threadpool(
+            job_queue.submit,
+            file.file, file.filename, src_lang, tgt_lang, profile=profile, batch_size=batch_size,
+            columns=columns, skip_patterns=skip_patterns,
+            include_paths=include_paths, exclude_paths=exclude_paths
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/jobs/")
+async def list_jobs(limit: int = 50):
+    return {"jobs": job_queue.list_jobs(limit), **job_queue.get_stats()}
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    try:
+        return job_queue.get_job(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+@router.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    try:
+        job = job_queue.get_job(job_id)
+        output_path = job_queue.get_result_path(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if output_path is None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}")
+
+    filename = Path(job["filename"])
+    return FileResponse(output_path, filename=f"{filename.stem}_translated{filename.suffix}")
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    try:
+        return job_queue.cancel(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
 
 @router.get("/supported-languages/")
 async def supported_languages():
     return translator.get_supported_languages()
+
+@router.get("/routes/")
+async def routing_table():
+    return translator.get_routing_table()
+
+@router.get("/decoding-profiles/")
+async def decoding_profiles():
+    return translator.get_decoding_profiles()
+
+@router.get("/models/")
+async def model_status():
+    return translator.get_model_status()
+
+@router.get("/queue-stats/")
+async def queue_stats():
+    return inference_executor.get_stats()
+
+@router.get("/batching-stats/")
+async def batching_stats():
+    return translator.get_batching_stats()
+
+@router.get("/pipeline-stats/")
+async def pipeline_stats():
+    return translator.get_pipeline_stats()
+
+@router.get("/translation-memory/")
+async def translation_memory_stats():
+    return translator.get_translation_memory_stats()
+
+@router.delete("/translation-memory/")
+async def clear_translation_memory():
+    return translator.clear_translation_memory()
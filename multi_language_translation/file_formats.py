@@ -0,0 +1,108 @@
+import codecs
+import csv
+import io
+from pathlib import Path
+
+from csv_engine import CsvCellFilter
+from json_stream import JsonPathFilter, iter_json_events, translate_json
+
+SUPPORTED_EXTENSIONS = (".txt", ".json", ".csv")
+
+
+def open_text_reader(binary, newline=None):
+    """
+    UTF-8 text view over a binary stream such as an upload spool. Call
+    ``detach()`` on it afterwards so the underlying stream is left open.
+    """
+    # SpooledTemporaryFile only implements the io.IOBase interface from Python 3.11
+    if not hasattr(binary, "readable"):
+        binary = binary._file
+    return io.TextIOWrapper(binary, encoding="utf-8", newline=newline)
+
+
+def open_text_writer(binary):
+    """UTF-8 text writer onto a binary stream; newlines are written as given."""
+    return codecs.getwriter("utf-8")(binary)
+
+
+class FileSegments:
+    """
+    The translatable segments of a txt/json/csv file in a fixed order,
+    selected the same way translate-file selects them: every line of a text
+    file, the non-empty string values accepted by the path filters in JSON
+    and, for CSV, the cells a CsvCellFilter picks (``columns`` minus blank
+    and skip-pattern cells). Segments are read from the file on demand and
+    the same file always yields the same order, so translations for a
+    prefix can be checkpointed and the file rebuilt from ``write()`` later.
+    """
+
+    def __init__(self, path, columns=None, skip_patterns=None, include_paths=None, exclude_paths=None):
+        self.path = str(path)
+        self.kind = Path(path).suffix.lower().lstrip(".")
+        if f".{self.kind}" not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported file format: {Path(path).suffix.lower()}")
+        if self.kind != "json" and (include_paths or exclude_paths):
+            raise ValueError("Path filters only apply to JSON files")
+        if self.kind != "csv" and (columns or skip_patterns):
+            raise ValueError("Column selection and skip patterns only apply to CSV files")
+        self.path_filter = JsonPathFilter(include_paths, exclude_paths)
+        self.cell_filter = CsvCellFilter(columns, skip_patterns)
+
+    def _open(self, path, mode):
+        return open(path, mode, encoding='utf-8', newline='' if self.kind == "csv" else None)
+
+    def iter_segments(self):
+        with self._open(self.path, 'r') as f:
+            if self.kind == "txt":
+                yield from f
+            elif self.kind == "json":
+                for event, path, value in iter_json_events(f):
+                    if event == "string" and value.strip() and self.path_filter.accepts(path):
+                        yield value
+            else:
+                reader = csv.reader(f)
+                headers = next(reader, None)
+                if headers is None:
+                    return
+                column_indices = self.cell_filter.resolve_columns(headers)
+                for row in reader:
+                    for index in column_indices:
+                        if index < len(row) and self.cell_filter.translatable(row[index]):
+                            yield row[index]
+
+    def count(self):
+        return sum(1 for _ in self.iter_segments())
+
+    def write(self, output_path, translations):
+        """Rebuild the file at ``output_path`` from one translation per segment, in order."""
+        remaining = iter(translations)
+        missing = object()
+
+        def take():
+            translation = next(remaining, missing)
+            if translation is missing:
+                raise ValueError("Fewer translations than segments")
+            return translation
+
+        with self._open(self.path, 'r') as source, self._open(output_path, 'w') as target:
+            if self.kind == "txt":
+                for _ in source:
+                    target.write(take())
+            elif self.kind == "json":
+                # Same pass over the document as translate-file, fed from the checkpointed translations
+                translate_json(source, target, lambda texts: [take() for _ in texts], path_filter=self.path_filter)
+            else:
+                reader = csv.reader(source)
+                writer = csv.writer(target)
+                headers = next(reader, None)
+                if headers is not None:
+                    writer.writerow(headers)
+                    column_indices = self.cell_filter.resolve_columns(headers)
+                    for row in reader:
+                        for index in column_indices:
+                            if index < len(row) and self.cell_filter.translatable(row[index]):
+                                row[index] = take()
+                        writer.writerow(row)
+
+        if next(remaining, missing) is not missing:
+            raise ValueError("More translations than segments")
@@ -0,0 +1,178 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Stages of one generate batch, in pipeline order
+STAGES = ("preprocess", "tokenize", "generate", "decode", "postprocess")
+
+_STAGE_SECONDS = Histogram(
+    "translation_stage_seconds",
+    "Time spent in one stage of a translation batch",
+    ["stage", "model_key"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+_BATCH_SIZE = Histogram(
+    "translation_batch_size",
+    "Segments per generate call",
+    ["model_key"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+_TOKENS = Histogram(
+    "translation_batch_tokens",
+    "Non-padding tokens per generate call",
+    ["model_key", "direction"],
+    buckets=(8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+)
+_MODEL_LOAD_SECONDS = Histogram(
+    "translation_model_load_seconds",
+    "Time to load a model into memory",
+    ["model_key"],
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+_CACHE_LOOKUPS = Counter(
+    "translation_cache_lookups_total",
+    "Translation memory and pivot cache lookups",
+    ["cache", "result"]
+)
+_CANCELLED_REQUESTS = Counter(
+    "translation_cancelled_total",
+    "Requests whose client disconnected before inference finished",
+    ["endpoint"]
+)
+_CANCELLED_GENERATES = Counter(
+    "translation_generate_cancelled_total",
+    "Generate calls stopped early because every request in the batch was abandoned",
+    ["model_key"]
+)
+
+_local = threading.local()
+
+
+class BatchTimings:
+    """Stage durations, size and token counts of one generate batch."""
+
+    def __init__(self, model_key):
+        self.model_key = model_key
+        self.seconds = {}
+        self.batch_size = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    @contextmanager
+    def stage(self, name):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start_time
+
+    def observe(self):
+        for stage, seconds in self.seconds.items():
+            _STAGE_SECONDS.labels(stage, self.model_key).observe(seconds)
+        _BATCH_SIZE.labels(self.model_key).observe(self.batch_size)
+        _TOKENS.labels(self.model_key, "input").observe(self.input_tokens)
+        _TOKENS.labels(self.model_key, "output").observe(self.output_tokens)
+
+
+class RequestTimings:
+    """
+    Everything one request touched: the batches it rode in (a micro-batch
+    is shared with other requests, so its stage times are the whole
+    batch's) and its cache lookups.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.batches = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def add_batch(self, timings):
+        with self._lock:
+            self.batches.append(timings)
+
+    def add_cache_lookups(self, hits, misses):
+        with self._lock:
+            self.cache_hits += hits
+            self.cache_misses += misses
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            stages_ms = {stage: 0.0 for stage in STAGES}
+            for timings in self.batches:
+                for stage, seconds in timings.seconds.items():
+                    stages_ms[stage] = stages_ms.get(stage, 0.0) + seconds * 1000
+            return {
+                "total_ms": round((time.perf_counter() - self.started_at) * 1000, 2),
+                "stages_ms": {stage: round(ms, 2) for stage, ms in stages_ms.items()},
+                "batches": [
+                    {
+                        "model_key": timings.model_key,
+                        "batch_size": timings.batch_size,
+                        "input_tokens": timings.input_tokens,
+                        "output_tokens": timings.output_tokens
+                    }
+                    for timings in self.batches
+                ],
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses
+            }
+
+
+@contextmanager
+def collect_timings():
+    """Collect the batches and cache lookups made by this thread into a RequestTimings."""
+    timings = RequestTimings()
+    with attach_timings(timings):
+        yield timings
+
+
+@contextmanager
+def attach_timings(timings):
+    """Make ``timings`` (e.g. from active_timings() in another thread) active in this thread."""
+    previous = getattr(_local, "timings", None)
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+def active_timings():
+    return getattr(_local, "timings", None)
+
+
+def record_batch(timings):
+    collector = active_timings()
+    if collector is not None:
+        collector.add_batch(timings)
+
+
+def record_cache_lookups(cache, hits, misses):
+    if hits:
+        _CACHE_LOOKUPS.labels(cache, "hit").inc(hits)
+    if misses:
+        _CACHE_LOOKUPS.labels(cache, "miss").inc(misses)
+    collector = active_timings()
+    if collector is not None:
+        collector.add_cache_lookups(hits, misses)
+
+
+def record_model_load(model_type, model_key, seconds):
+    _MODEL_LOAD_SECONDS.labels(model_key).observe(seconds)
+
+
+def record_cancelled_request(endpoint):
+    _CANCELLED_REQUESTS.labels(endpoint).inc()
+
+
+def record_cancelled_generate(model_key):
+    _CANCELLED_GENERATES.labels(model_key).inc()
+
+
+def render_metrics():
+    """(body, content type) in the Prometheus text exposition format."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,431 @@
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from itertools import islice
+from pathlib import Path
+
+from csv_engine import CsvTranslationEngine
+from file_formats import SUPPORTED_EXTENSIONS, FileSegments
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "completed", "failed", "cancelled")
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class JobNotFoundError(KeyError):
+    pass
+
+
+class TranslationJobQueue:
+    """
+    Persistent queue of file translation jobs backed by SQLite.
+
+    Each job's input is stored under ``jobs_dir/<job_id>/``, with the same
+    column, skip-pattern and JSON path options translate-file takes. Worker
+    threads claim queued jobs, stream their segments from disk, translate
+    them ``chunk_segments`` at a time
+    and checkpoint every chunk's translations to the database, so a job
+    interrupted by a restart picks up at the first unfinished chunk. A
+    running job whose worker stopped heartbeating for ``lease_seconds`` is
+    considered abandoned and claimed again (up to ``max_attempts`` times),
+    which also makes the queue safe to share between the processes started
+    by serve.py.
+    """
+
+    def __init__(self, translator, db_path, jobs_dir, workers=1, chunk_segments=128, lease_seconds=600.0,
+                 max_attempts=3, retention_seconds=7 * 24 * 3600, poll_interval=1.0, csv_max_failed_values=50):
+        self.translator = translator
+        self.db_path = Path(db_path)
+        self.jobs_dir = Path(jobs_dir)
+        self.workers = workers
+        self.chunk_segments = chunk_segments
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.poll_interval = poll_interval
+        self.csv_max_failed_values = csv_max_failed_values
+
+        self._threads = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._last_purge = 0.0
+
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect()
+        # Same as TranslationMemory: workers forked by serve.py reconnect
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _connect(self):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                src_lang TEXT NOT NULL,
+                tgt_lang TEXT NOT NULL,
+                profile TEXT,
+                batch_size INTEGER,
+                options TEXT,
+                chunk_segments INTEGER,
+                input_path TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                total_segments INTEGER,
+                done_segments INTEGER NOT NULL DEFAULT 0,
+                processing_seconds REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                heartbeat_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_chunks (
+                job_id TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                translations TEXT NOT NULL,
+                PRIMARY KEY (job_id, chunk_index)
+            )
+            """
+        )
+
+    def _after_fork(self):
+        self._connect()
+        # Threads don't survive fork; start() runs again in the worker
+        self._threads = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+    def start(self):
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker_loop, name=f"translation-job-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, fileobj, filename, src_lang, tgt_lang, profile=None, batch_size=None, columns=None,
+               skip_patterns=None, include_paths=None, exclude_paths=None) -> dict:
+        suffix = Path(filename).suffix.lower()
+        if suffix not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported file format: {suffix}")
+
+        options = {
+            name: list(value) for name, value in (
+                ("columns", columns), ("skip_patterns", skip_patterns),
+                ("include_paths", include_paths), ("exclude_paths", exclude_paths)
+            ) if value
+        }
+        # Rejects bad filters and patterns before anything is written
+        FileSegments(f"input{suffix}", **options)
+
+        job_id = uuid.uuid4().hex
+        job_dir = self.jobs_dir / job_id
+        job_dir.mkdir(parents=True)
+        input_path = job_dir / f"input{suffix}"
+        output_path = job_dir / f"output{suffix}"
+        with open(input_path, "wb") as f:
+            shutil.copyfileobj(fileobj, f)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, filename, src_lang, tgt_lang, profile, batch_size, options, "
+                "chunk_segments, input_path, output_path, created_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, Path(filename).name, src_lang, tgt_lang, profile, batch_size,
+                 json.dumps(options), self.chunk_segments, str(input_path), str(output_path), time.time())
+            )
+        self._wakeup.set()
+        return self.get_job(job_id)
+
+    def _get_row(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise JobNotFoundError(job_id)
+        return row
+
+    def get_job(self, job_id) -> dict:
+        return self._describe(self._get_row(job_id))
+
+    def list_jobs(self, limit=50) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._describe(row) for row in rows]
+
+    def get_result_path(self, job_id):
+        """Output file of a completed job, or None while it isn't completed."""
+        row = self._get_row(job_id)
+        if row["status"] != "completed":
+            return None
+        return row["output_path"]
+
+    def cancel(self, job_id) -> dict:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', owner = NULL, finished_at = ? "
+                "WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id)
+            )
+        if cursor.rowcount:
+            self._discard_chunks(job_id)
+        return self.get_job(job_id)
+
+    def _describe(self, row) -> dict:
+        total = row["total_segments"]
+        done = row["done_segments"]
+        throughput = done / row["processing_seconds"] if row["processing_seconds"] > 0 else None
+        eta_seconds = None
+        if row["status"] in ("queued", "running") and throughput and total is not None:
+            eta_seconds = round((total - done) / throughput, 1)
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "filename": row["filename"],
+            "source_language": row["src_lang"],
+            "target_language": row["tgt_lang"],
+            "decoding_profile": row["profile"],
+            "options": json.loads(row["options"]),
+            "progress": {
+                "segments_done": done,
+                "segments_total": total,
+                "percent": round(100.0 * done / total, 1) if total else (100.0 if total == 0 else 0.0)
+            },
+            "segments_per_second": round(throughput, 2) if throughput else None,
+            "eta_seconds": eta_seconds,
+            "attempts": row["attempts"],
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"]
+        }
+
+    def _claim_next(self, owner):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'running' AND heartbeat_at < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (now - self.lease_seconds,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                if row["attempts"] >= self.max_attempts:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'failed', owner = NULL, finished_at = ?, error = ? WHERE id = ?",
+                        (now, f"Gave up after {row['attempts']} attempts", row["id"])
+                    )
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, attempts = attempts + 1, "
+                    "started_at = COALESCE(started_at, ?), heartbeat_at = ? WHERE id = ?",
+                    (owner, now, now, row["id"])
+                )
+                self._conn.execute("COMMIT")
+                return row
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _worker_loop(self):
+        owner = f"{os.getpid()}:{threading.current_thread().name}"
+        while not self._stop.is_set():
+            try:
+                row = self._claim_next(owner)
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Could not claim a translation job: {e}")
+                row = None
+            if row is None:
+                self._maybe_purge()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run_job(row, owner)
+
+    def _done_chunks(self, job_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_index FROM job_chunks WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {row["chunk_index"] for row in rows}
+
+    def _iter_translations(self, job_id, chunk_count):
+        """Checkpointed translations in order, loaded one chunk at a time."""
+        for chunk_index in range(chunk_count):
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT translations FROM job_chunks WHERE job_id = ? AND chunk_index = ?",
+                    (job_id, chunk_index)
+                ).fetchone()
+            if row is None:
+                raise RuntimeError(f"Checkpoint for chunk {chunk_index} is missing")
+            yield from json.loads(row["translations"])
+
+    def _checkpoint(self, job_id, owner, chunk_index, translations, elapsed):
+        """Store one chunk; returns False if this worker no longer owns the job."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET done_segments = done_segments + ?, "
+                    "processing_seconds = processing_seconds + ?, heartbeat_at = ? "
+                    "WHERE id = ? AND owner = ? AND status = 'running'",
+                    (len(translations), elapsed, time.time(), job_id, owner)
+                )
+                if cursor.rowcount:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO job_chunks (job_id, chunk_index, translations) VALUES (?, ?, ?)",
+                        (job_id, chunk_index, json.dumps(translations, ensure_ascii=False))
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return bool(cursor.rowcount)
+
+    def _finish(self, job_id, owner, status, error=None):
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, owner = NULL, finished_at = ? "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (status, error, time.time(), job_id, owner)
+            )
+        if cursor.rowcount:
+            self._discard_chunks(job_id)
+
+    def _release(self, job_id, owner):
+        # Shutting down: hand the job back without counting the attempt
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, attempts = attempts - 1 "
+                "WHERE id = ? AND owner = ? AND status = 'running'",
+                (job_id, owner)
+            )
+
+    def _discard_chunks(self, job_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM job_chunks WHERE job_id = ?", (job_id,))
+
+    def _chunk_translator(self, kind, row):
+        src_lang, tgt_lang = row["src_lang"], row["tgt_lang"]
+        kwargs = {"batch_size": row["batch_size"], "profile": row["profile"]}
+        if kind == "txt":
+            return lambda segments: self.translator.translate_lines(segments, src_lang, tgt_lang, **kwargs)
+        if kind == "json":
+            return lambda segments: self.translator.translate_batch(segments, src_lang, tgt_lang, **kwargs)
+        # CSV cells that fail keep their source text and a systemic failure
+        # fails the job, the same as translate-file
+        engine = CsvTranslationEngine(
+            lambda texts: self.translator.translate_batch(texts, src_lang, tgt_lang, **kwargs),
+            max_failed_values=self.csv_max_failed_values
+        )
+        return engine.translate_values
+
+    def _run_job(self, row, owner):
+        job_id = row["id"]
+        try:
+            document = FileSegments(row["input_path"], **json.loads(row["options"]))
+            total = document.count()
+            with self._lock:
+                self._conn.execute("UPDATE jobs SET total_segments = ? WHERE id = ?", (total, job_id))
+
+            # Checkpoints are per chunk index, so a resumed job keeps the
+            # chunk size it started with whatever the current setting is
+            chunk_segments = row["chunk_segments"]
+
+            done_chunks = self._done_chunks(job_id)
+            if done_chunks:
+                logger.info(f"Resuming translation job {job_id} at chunk {len(done_chunks)}")
+
+            translate_chunk = self._chunk_translator(document.kind, row)
+            segments = document.iter_segments()
+            chunk_count = 0
+            while True:
+                chunk = list(islice(segments, chunk_segments))
+                if not chunk:
+                    break
+                chunk_index = chunk_count
+                chunk_count += 1
+                if chunk_index in done_chunks:
+                    continue
+                if self._stop.is_set():
+                    segments.close()
+                    self._release(job_id, owner)
+                    return
+                started_at = time.time()
+                translated = translate_chunk(chunk)
+                if not self._checkpoint(job_id, owner, chunk_index, translated, time.time() - started_at):
+                    segments.close()
+                    logger.info(f"Translation job {job_id} was cancelled or reassigned, stopping")
+                    return
+
+            document.write(row["output_path"], self._iter_translations(job_id, chunk_count))
+            self._finish(job_id, owner, "completed")
+        except Exception as e:
+            logger.error(f"Translation job {job_id} failed: {e}")
+            self._finish(job_id, owner, "failed", error=str(e))
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._last_purge < 3600:
+            return
+        self._last_purge = now
+        self.purge_finished(now - self.retention_seconds)
+
+    def purge_finished(self, before) -> int:
+        """Delete finished jobs (and their files) that finished before ``before``."""
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM jobs WHERE status IN ({placeholders}) AND finished_at < ?",
+                (*FINISHED_STATUSES, before)
+            ).fetchall()
+            for row in rows:
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (row["id"],))
+                self._conn.execute("DELETE FROM job_chunks WHERE job_id = ?", (row["id"],))
+        for row in rows:
+            shutil.rmtree(self.jobs_dir / row["id"], ignore_errors=True)
+        return len(rows)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "workers": self.workers,
+            "chunk_segments": self.chunk_segments,
+            "jobs": {status: counts.get(status, 0) for status in JOB_STATUSES}
+        }
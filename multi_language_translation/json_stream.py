@@ -0,0 +1,308 @@
+"""
+Incremental JSON translation.
+
+The input is tokenized in fixed-size chunks and turned into a stream of
+(event, path, value) tuples; string leaves accepted by a JsonPathFilter
+are collected into batches, translated, and the events are written back
+out in order, so memory stays bounded by the batch rather than the
+document. Output matches ``json.dump(..., ensure_ascii=False, indent=2)``
+except that numbers are copied through verbatim.
+"""
+import json
+import re
+from json.decoder import scanstring
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null")
+_SCALAR_END = re.compile(r"[ \t\n\r,\]}]")
+_STRUCTURAL = "{}[]:,"
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+class _Lexer:
+    def __init__(self, f, chunk_size=64 * 1024):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.consumed = 0
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.consumed += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _error(self, message):
+        return JsonStreamError(f"{message} at character {self.consumed + self.pos}")
+
+    def next_token(self):
+        """(kind, value): kind is a structural character, "string", "scalar" or "eof"."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                break
+        if self.pos >= len(self.buf):
+            return "eof", None
+
+        char = self.buf[self.pos]
+        if char in _STRUCTURAL:
+            self.pos += 1
+            return char, None
+
+        if char == '"':
+            while True:
+                try:
+                    value, end = scanstring(self.buf, self.pos + 1)
+                except json.JSONDecodeError as e:
+                    # The string (or an escape in it) may run past the
+                    # buffered chunk; only fail once the file is exhausted
+                    cut_off = "Unterminated" in e.msg or e.pos >= len(self.buf) - 6
+                    if cut_off and self._fill():
+                        continue
+                    raise self._error(e.msg)
+                self.pos = end
+                return "string", value
+
+        # Make sure the whole scalar is buffered before matching it
+        while not _SCALAR_END.search(self.buf, self.pos) and self._fill():
+            pass
+        match = _SCALAR.match(self.buf, self.pos)
+        if match is None:
+            raise self._error(f"Unexpected {char!r}")
+        self.pos = match.end()
+        return "scalar", match.group()
+
+
+def iter_json_events(f, chunk_size=64 * 1024):
+    """
+    Yield (event, path, value) for a JSON document read incrementally from
+    text file ``f``. Events are start_map, end_map, start_array, end_array,
+    key (value = key), string (value = decoded string) and scalar (value =
+    source text of a number, true, false or null). ``path`` is a tuple of
+    keys and array indices leading to the value.
+    """
+    lexer = _Lexer(f, chunk_size)
+
+    def parse_value(path, token):
+        kind, value = token
+        if kind == "{":
+            yield from parse_object(path)
+        elif kind == "[":
+            yield from parse_array(path)
+        elif kind in ("string", "scalar"):
+            yield kind, path, value
+        else:
+            raise lexer._error(f"Expected a value, got {kind!r}")
+
+    def parse_object(path):
+        yield "start_map", path, None
+        kind, value = lexer.next_token()
+        if kind != "}":
+            while True:
+                if kind != "string":
+                    raise lexer._error("Expected an object key")
+                key = value
+                yield "key", path, key
+                if lexer.next_token()[0] != ":":
+                    raise lexer._error("Expected ':'")
+                yield from parse_value(path + (key,), lexer.next_token())
+                kind, _ = lexer.next_token()
+                if kind == "}":
+                    break
+                if kind != ",":
+                    raise lexer._error("Expected ',' or '}'")
+                kind, value = lexer.next_token()
+        yield "end_map", path, None
+
+    def parse_array(path):
+        yield "start_array", path, None
+        token = lexer.next_token()
+        index = 0
+        if token[0] != "]":
+            while True:
+                yield from parse_value(path + (index,), token)
+                index += 1
+                kind, _ = lexer.next_token()
+                if kind == "]":
+                    break
+                if kind != ",":
+                    raise lexer._error("Expected ',' or ']'")
+                token = lexer.next_token()
+        yield "end_array", path, None
+
+    yield from parse_value((), lexer.next_token())
+    if lexer.next_token()[0] != "eof":
+        raise lexer._error("Extra data after the document")
+
+
+_PATH_STEP = re.compile(
+    r"\.\.([A-Za-z_$][\w$-]*)?|\.\*|\[\*\]|\.([A-Za-z_$][\w$-]*)|\[(\d+)\]|\[(['\"])(.*?)\4\]"
+)
+
+
+def _compile_path(pattern):
+    if not pattern.startswith("$"):
+        raise ValueError(f"Path filter must start with '$': {pattern}")
+    steps = []
+    position = 1
+    while position < len(pattern):
+        match = _PATH_STEP.match(pattern, position)
+        if match is None:
+            raise ValueError(f"Invalid path filter {pattern!r} at {pattern[position:]!r}")
+        token = match.group()
+        if token.startswith(".."):
+            steps.append(("descent", None))
+            if match.group(1) is not None:
+                steps.append(("key", match.group(1)))
+        elif token in (".*", "[*]"):
+            steps.append(("any", None))
+        elif match.group(2) is not None:
+            steps.append(("key", match.group(2)))
+        elif match.group(3) is not None:
+            steps.append(("index", int(match.group(3))))
+        else:
+            steps.append(("key", match.group(5)))
+        position = match.end()
+    if steps and steps[-1][0] == "descent":
+        raise ValueError(f"Path filter can't end with '..': {pattern}")
+    return steps
+
+
+def _matches(steps, path, step_index=0, path_index=0):
+    # Patterns match the node they name and everything below it
+    if step_index == len(steps):
+        return True
+    kind, expected = steps[step_index]
+    if kind == "descent":
+        return any(
+            _matches(steps, path, step_index + 1, start) for start in range(path_index, len(path))
+        )
+    if path_index == len(path):
+        return False
+    component = path[path_index]
+    if kind == "key" and not (isinstance(component, str) and component == expected):
+        return False
+    if kind == "index" and not (isinstance(component, int) and component == expected):
+        return False
+    return _matches(steps, path, step_index + 1, path_index + 1)
+
+
+class JsonPathFilter:
+    """
+    Decides which string leaves get translated, from JSONPath-style
+    patterns such as ``$.items[*].title``, ``$..description`` or
+    ``$["meta"]["notes"]``. A pattern covers the node it names and
+    everything below it. With no include patterns every string is
+    included; exclude patterns win over include patterns.
+    """
+
+    def __init__(self, include=None, exclude=None):
+        self.include = [_compile_path(pattern) for pattern in include or []]
+        self.exclude = [_compile_path(pattern) for pattern in exclude or []]
+
+    def accepts(self, path):
+        if self.include and not any(_matches(steps, path) for steps in self.include):
+            return False
+        return not any(_matches(steps, path) for steps in self.exclude)
+
+
+class _JsonWriter:
+    def __init__(self, f, indent=2):
+        self.f = f
+        self.indent = " " * indent
+        # One [children written] counter per open container
+        self.stack = []
+        self.after_key = False
+
+    def _begin_value(self):
+        if self.after_key:
+            self.after_key = False
+            return
+        if self.stack:
+            self.f.write(("," if self.stack[-1] else "") + "\n" + self.indent * len(self.stack))
+            self.stack[-1] += 1
+
+    def write(self, event, value):
+        if event in ("start_map", "start_array"):
+            self._begin_value()
+            self.f.write("{" if event == "start_map" else "[")
+            self.stack.append(0)
+        elif event in ("end_map", "end_array"):
+            children = self.stack.pop()
+            if children:
+                self.f.write("\n" + self.indent * len(self.stack))
+            self.f.write("}" if event == "end_map" else "]")
+        elif event == "key":
+            self.f.write(("," if self.stack[-1] else "") + "\n" + self.indent * len(self.stack))
+            self.f.write(json.dumps(value, ensure_ascii=False) + ": ")
+            self.stack[-1] += 1
+            self.after_key = True
+        elif event == "string":
+            self._begin_value()
+            self.f.write(json.dumps(value, ensure_ascii=False))
+        else:
+            self._begin_value()
+            self.f.write(value)
+
+
+def translate_json(source, target, translate_fn, batch_strings=512, path_filter=None, max_buffered_events=100000):
+    """
+    Translate the string leaves of the JSON document read from text stream
+    ``source`` into ``target`` without loading either document.
+    ``translate_fn(texts)`` is called with up to ``batch_strings`` strings
+    at a time and must return one translation per text. Returns counts of
+    translated and filtered-out strings.
+    """
+    path_filter = path_filter or JsonPathFilter()
+    stats = {"strings_translated": 0, "strings_skipped": 0, "batches": 0}
+
+    writer = _JsonWriter(target)
+    # Events held back until the strings among them are translated;
+    # translatable strings are stored as an index into pending_texts
+    buffered = []
+    pending_texts = []
+
+    def flush():
+        translations = translate_fn(pending_texts) if pending_texts else []
+        if pending_texts:
+            stats["batches"] += 1
+            stats["strings_translated"] += len(pending_texts)
+        for event, value in buffered:
+            if event == "pending":
+                writer.write("string", translations[value])
+            else:
+                writer.write(event, value)
+        buffered.clear()
+        pending_texts.clear()
+
+    for event, path, value in iter_json_events(source):
+        if event == "string" and value.strip():
+            if path_filter.accepts(path):
+                buffered.append(("pending", len(pending_texts)))
+                pending_texts.append(value)
+                if len(pending_texts) >= batch_strings:
+                    flush()
+                continue
+            stats["strings_skipped"] += 1
+
+        if not pending_texts:
+            writer.write(event, value)
+            continue
+        buffered.append((event, value))
+        if len(buffered) >= max_buffered_events:
+            flush()
+
+    flush()
+
+    return stats
@@ -1,6 +1,7 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from endpoint import router
+import instrumentation
 app = FastAPI()
 
 app.include_router(router, prefix="/api", tags=["multi_language_translation"])
@@ -12,3 +13,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def metrics():
+    # Per process: with serve.py each worker exports its own series
+    body, content_type = instrumentation.render_metrics()
+    return Response(content=body, media_type=content_type)
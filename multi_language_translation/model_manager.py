@@ -1,13 +1,34 @@
-
+import hashlib
+import json
 import os
+import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import transformers
 from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
 
+# Written next to each locally stored model; see ModelManager._write_manifest
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _sha256(path, chunk_size=8 * 1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class ModelManager:
-    def __init__(self, base_dir="ds_models"): 
+    def __init__(self, base_dir="ds_models", extra_models=None, verify_checksums=False): 
         # Create the translation subdirectory within ds_models
         self.base_dir = Path(base_dir) / "translation"
+        self.verify_checksums = verify_checksums
+        self.load_stats = {}
+        self._stats_lock = threading.Lock()
         self.model_configs = {
             "indictrans2": {
                 "en_to_indic": "ai4bharat/indictrans2-en-indic-dist-200M",
@@ -18,8 +39,41 @@ class ModelManager:
                 "zh_to_en": "Helsinki-NLP/opus-mt-zh-en"
             }
         }
+        # Language pairs each model translates; the routing graph is built from these
+        self.model_pairs = {
+            "en_to_indic": [("eng_Latn", "hin_Deva"), ("eng_Latn", "urd_Arab")],
+            "indic_to_en": [("hin_Deva", "eng_Latn"), ("urd_Arab", "eng_Latn")],
+            "en_to_zh": [("eng_Latn", "zh")],
+            "zh_to_en": [("zh", "eng_Latn")]
+        }
+        if extra_models:
+            self.register_models(extra_models)
         self._setup_directories()
     
+    def register_models(self, models):
+        """
+        Add models from a {model_type: {model_key: {"model_id": ..., "pairs": [[src, tgt], ...]}}}
+        mapping, e.g. loaded from TRANSLATION_EXTRA_MODELS_FILE.
+        """
+        for model_type, entries in models.items():
+            if model_type not in self.model_configs:
+                raise ValueError(f"Unknown model type: {model_type}")
+            for model_key, entry in entries.items():
+                self.model_configs[model_type][model_key] = entry["model_id"]
+                self.model_pairs[model_key] = [tuple(pair) for pair in entry["pairs"]]
+    
+    def iter_model_pairs(self):
+        for model_type, models in self.model_configs.items():
+            for model_key in models:
+                for src_lang, tgt_lang in self.model_pairs.get(model_key, []):
+                    yield model_type, model_key, src_lang, tgt_lang
+    
+    def get_model_type(self, model_key):
+        for model_type, models in self.model_configs.items():
+            if model_key in models:
+                return model_type
+        raise ValueError(f"Unknown model key: {model_key}")
+    
     def _setup_directories(self):
         for model_type in self.model_configs.keys():
             (self.base_dir / model_type).mkdir(parents=True, exist_ok=True)
@@ -39,15 +93,67 @@ class ModelManager:
         
         return cache_dir
     
-    def _is_model_cached(self, cache_dir):
-        path = Path(cache_dir)
+    def get_export_dir(self, model_type, model_key, backend):
+        # Exported artifacts live next to the HF weights they were built from
+        return str(Path(self.get_model_path(model_type, model_key)["cache_dir"]) / "exports" / backend)
+    
+    def is_export_cached(self, export_dir):
+        path = Path(export_dir)
         return path.exists() and any(path.iterdir())
     
+    def read_manifest(self, cache_dir):
+        manifest_path = Path(cache_dir) / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def verify_model(self, cache_dir, checksums=None):
+        """
+        Check a local model against its manifest. Sizes are always checked;
+        sha256 checksums only when ``checksums`` (default: verify_checksums)
+        is set, since hashing the weights costs a full read of them.
+        Returns (ok, reason).
+        """
+        manifest = self.read_manifest(cache_dir)
+        if manifest is None:
+            return False, "missing manifest"
+        if manifest.get("version") != MANIFEST_VERSION:
+            return False, f"manifest version {manifest.get('version')}"
+        
+        checksums = self.verify_checksums if checksums is None else checksums
+        for name, entry in manifest["files"].items():
+            path = Path(cache_dir) / name
+            if not path.exists():
+                return False, f"missing file {name}"
+            if path.stat().st_size != entry["size"]:
+                return False, f"size mismatch for {name}"
+            if checksums and _sha256(path) != entry["sha256"]:
+                return False, f"checksum mismatch for {name}"
+        return True, None
+    
+    def _is_model_cached(self, cache_dir):
+        ok, reason = self.verify_model(cache_dir)
+        if not ok and Path(cache_dir).exists() and any(Path(cache_dir).iterdir()):
+            print(f"Local model store at {cache_dir} is not usable ({reason}), rebuilding it")
+        return ok
+    
     def _download_model(self, model_id, cache_dir):
+        """
+        Fetch a model once and store it as a single safetensors copy with a
+        manifest. Downloads go through the HF hub cache inside ``cache_dir``
+        (so caches from older versions are reused rather than fetched
+        again), which is removed once the converted copy is in place.
+        """
         print(f"Downloading model: {model_id}")
         start_time = time.time()
         
         os.makedirs(cache_dir, exist_ok=True)
+        staging_dir = Path(cache_dir) / ".staging"
+        shutil.rmtree(staging_dir, ignore_errors=True)
         
         tokenizer = AutoTokenizer.from_pretrained(
             model_id, 
@@ -61,8 +167,107 @@ class ModelManager:
             trust_remote_code=True
         )
         
-        tokenizer.save_pretrained(cache_dir)
-        model.save_pretrained(cache_dir)
+        tokenizer.save_pretrained(staging_dir)
+        model.save_pretrained(staging_dir, safe_serialization=True)
+        dtype = str(model.dtype).replace("torch.", "")
+        del model
+        
+        # Swap the converted copy in: drop the hub cache and any files left
+        # by older layouts, keep exports built from the same weights.
+        for entry in Path(cache_dir).iterdir():
+            if entry.name in ("exports", staging_dir.name):
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink()
+        for entry in staging_dir.iterdir():
+            entry.rename(Path(cache_dir) / entry.name)
+        staging_dir.rmdir()
+        
+        # Written last: a store without a manifest is rebuilt on next start
+        self._write_manifest(cache_dir, model_id, dtype)
         
         elapsed = time.time() - start_time
         print(f"Model downloaded in {elapsed:.1f}s")
+    
+    def _write_manifest(self, cache_dir, model_id, dtype):
+        files = {}
+        for path in sorted(Path(cache_dir).rglob("*")):
+            relative = path.relative_to(cache_dir)
+            if not path.is_file() or relative.parts[0] == "exports" or path.name == MANIFEST_NAME:
+                continue
+            files[relative.as_posix()] = {"size": path.stat().st_size, "sha256": _sha256(path)}
+        
+        weight_files = [name for name in files if name.endswith((".safetensors", ".bin"))]
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "model_id": model_id,
+            "format": "safetensors" if all(name.endswith(".safetensors") for name in weight_files) else "pytorch",
+            "dtype": dtype,
+            "transformers_version": transformers.__version__,
+            "created_at": time.time(),
+            "files": files
+        }
+        manifest_path = Path(cache_dir) / MANIFEST_NAME
+        tmp_path = manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+    
+    def load_pretrained(self, model_type, model_key, torch_dtype=None, device="cpu", trust_remote_code=False):
+        """
+        Load (model, tokenizer) from the local store, reading the tokenizer
+        and the weights in parallel. Safetensors weights are memory-mapped
+        and ``low_cpu_mem_usage`` materializes each tensor straight from the
+        mapping instead of building a randomly initialized model first.
+        """
+        start_time = time.time()
+        cache_dir = self.ensure_model_available(model_type, model_key)
+        ensure_seconds = time.time() - start_time
+        
+        def load_tokenizer():
+            started = time.time()
+            tokenizer = AutoTokenizer.from_pretrained(cache_dir, trust_remote_code=trust_remote_code)
+            return tokenizer, time.time() - started
+        
+        def load_model():
+            started = time.time()
+            model = AutoModelForSeq2SeqLM.from_pretrained(
+                cache_dir,
+                trust_remote_code=trust_remote_code,
+                torch_dtype=torch_dtype,
+                low_cpu_mem_usage=True
+            ).to(device)
+            model.eval()
+            return model, time.time() - started
+        
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"load-{model_key}") as pool:
+            tokenizer_future = pool.submit(load_tokenizer)
+            model_future = pool.submit(load_model)
+            tokenizer, tokenizer_seconds = tokenizer_future.result()
+            model, model_seconds = model_future.result()
+        
+        manifest = self.read_manifest(cache_dir) or {}
+        stats = {
+            "model_id": manifest.get("model_id"),
+            "format": manifest.get("format"),
+            "stored_dtype": manifest.get("dtype"),
+            "store_check_seconds": round(ensure_seconds, 3),
+            "tokenizer_seconds": round(tokenizer_seconds, 3),
+            "model_seconds": round(model_seconds, 3),
+            "total_seconds": round(time.time() - start_time, 3),
+            "loaded_at": time.time()
+        }
+        with self._stats_lock:
+            self.load_stats[model_key] = stats
+        print(
+            f"Cold start {model_key}: {stats['total_seconds']:.2f}s "
+            f"(store {stats['store_check_seconds']:.2f}s, tokenizer {stats['tokenizer_seconds']:.2f}s, "
+            f"weights {stats['model_seconds']:.2f}s, {stats['format']})"
+        )
+        return model, tokenizer
+    
+    def get_load_stats(self) -> dict:
+        with self._stats_lock:
+            return {model_key: dict(stats) for model_key, stats in self.load_stats.items()}
@@ -0,0 +1,173 @@
+import gc
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class ModelResidencyManager:
+    """
+    Keeps loaded translation models resident within a RAM budget.
+
+    Models are tracked per (model_type, model_key) in least-recently-used
+    order. When loading a model pushes the total footprint over the budget,
+    the least recently used models are evicted until it fits again. The most
+    recently loaded model is never evicted, even if it alone exceeds the
+    budget.
+    """
+
+    def __init__(self, model_manager, memory_budget_mb=None, on_load=None):
+        """
+        ``on_load(model_type, model_key, load_seconds)`` is called after each load.
+        """
+        self.model_manager = model_manager
+        self.on_load = on_load
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+
+        self._resident = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._evictions = 0
+
+    @staticmethod
+    def estimate_footprint(model) -> int:
+        if not hasattr(model, "state_dict"):
+            # ONNX Runtime models: approximate by the size of the exported graphs
+            save_dir = getattr(model, "model_save_dir", None)
+            if save_dir is None:
+                return 0
+            return sum(f.stat().st_size for f in Path(save_dir).glob("*.onnx*"))
+
+        # Walk the state dict rather than parameters() so dynamically
+        # quantized Linear layers (packed weight tuples) are counted, and
+        # skip tied tensors that appear under more than one name.
+        seen = set()
+        total = 0
+        for value in model.state_dict().values():
+            for tensor in (value if isinstance(value, tuple) else (value,)):
+                if not hasattr(tensor, "data_ptr") or tensor.data_ptr() in seen:
+                    continue
+                seen.add(tensor.data_ptr())
+                total += tensor.numel() * tensor.element_size()
+        return total
+
+    def get(self, model_type, model_key, loader):
+        """
+        Return (model, tokenizer), calling ``loader(model_key)`` on a miss.
+        """
+        key = (model_type, model_key)
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                return entry["model"], entry["tokenizer"]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Serialize loads of the same model so concurrent misses load it once.
+        with load_lock:
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    return entry["model"], entry["tokenizer"]
+
+            start_time = time.time()
+            model, tokenizer = loader(model_key)
+            load_seconds = time.time() - start_time
+            if self.on_load is not None:
+                self.on_load(model_type, model_key, load_seconds)
+
+            with self._lock:
+                self._resident[key] = {
+                    "model": model,
+                    "tokenizer": tokenizer,
+                    "model_id": self.model_manager.get_model_path(model_type, model_key)["model_id"],
+                    "footprint_bytes": self.estimate_footprint(model),
+                    "load_seconds": load_seconds,
+                    "loaded_at": time.time(),
+                    "last_used": time.time(),
+                    "uses": 1
+                }
+                evicted = self._evict_to_budget(keep=key)
+
+        if evicted:
+            self._release_memory()
+            print(f"Evicted models to stay within budget: {', '.join(evicted)}")
+
+        return model, tokenizer
+
+    def _touch(self, key):
+        entry = self._resident.get(key)
+        if entry is not None:
+            self._resident.move_to_end(key)
+            entry["last_used"] = time.time()
+            entry["uses"] += 1
+        return entry
+
+    def _total_footprint(self):
+        return sum(entry["footprint_bytes"] for entry in self._resident.values())
+
+    def _evict_to_budget(self, keep):
+        evicted = []
+        if self.memory_budget_bytes is None:
+            return evicted
+
+        while self._total_footprint() > self.memory_budget_bytes:
+            victim = next((key for key in self._resident if key != keep), None)
+            if victim is None:
+                break
+            del self._resident[victim]
+            self._evictions += 1
+            evicted.append("/".join(victim))
+        return evicted
+
+    def _release_memory(self):
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def evict(self, model_type, model_key) -> bool:
+        with self._lock:
+            removed = self._resident.pop((model_type, model_key), None) is not None
+            if removed:
+                self._evictions += 1
+        if removed:
+            self._release_memory()
+        return removed
+
+    def resident_models(self):
+        """Snapshot of (model_type, model_key, model) for every resident model."""
+        with self._lock:
+            return [(model_type, model_key, entry["model"]) for (model_type, model_key), entry in self._resident.items()]
+
+    def is_resident(self, model_type, model_key) -> bool:
+        with self._lock:
+            return (model_type, model_key) in self._resident
+
+    def get_status(self) -> dict:
+        with self._lock:
+            models = [
+                {
+                    "model_type": model_type,
+                    "model_key": model_key,
+                    "model_id": entry["model_id"],
+                    "footprint_mb": round(entry["footprint_bytes"] / (1024 * 1024), 1),
+                    "load_seconds": round(entry["load_seconds"], 2),
+                    "loaded_at": entry["loaded_at"],
+                    "last_used": entry["last_used"],
+                    "uses": entry["uses"]
+                }
+                # Most recently used first
+                for (model_type, model_key), entry in reversed(self._resident.items())
+            ]
+            return {
+                "memory_budget_mb": (
+                    round(self.memory_budget_bytes / (1024 * 1024), 1)
+                    if self.memory_budget_bytes is not None else None
+                ),
+                "resident_mb": round(self._total_footprint() / (1024 * 1024), 1),
+                "evictions": self._evictions,
+                "models": models
+            }
@@ -0,0 +1,62 @@
+import os
+
+import torch
+
+
+def available_cpus():
+    """CPUs this process may run on (its affinity mask where the OS has one)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class ReplicaLayout:
+    """
+    How generate workers split the machine: ``replicas`` workers per model
+    pair pull from the pair's shared batch queue, each with its own
+    intra-op thread budget and, with ``pin_cpus``, its own slice of the
+    CPUs. Replicas share one copy of the weights; inference only reads
+    them, so memory doesn't grow with the replica count.
+    """
+
+    def __init__(self, replicas=1, threads_per_replica=0, pin_cpus=False, cpus=None):
+        cpus = list(cpus) if cpus else available_cpus()
+        self.replicas = max(1, int(replicas))
+        self.threads_per_replica = int(threads_per_replica) or max(1, len(cpus) // self.replicas)
+        self.cpu_sets = None
+        if pin_cpus and hasattr(os, "sched_setaffinity"):
+            # Contiguous slices, wrapping around if the layout oversubscribes
+            self.cpu_sets = [
+                {cpus[(index * self.threads_per_replica + offset) % len(cpus)]
+                 for offset in range(self.threads_per_replica)}
+                for index in range(self.replicas)
+            ]
+
+    def init_worker(self, index):
+        """Run on replica ``index``'s own thread before it takes any work."""
+        # ATen sets each thread's OpenMP team size lazily on first use, from
+        # the last process-wide value; trigger that first so ours sticks
+        torch.get_num_threads()
+        torch.set_num_threads(self.threads_per_replica)
+        if self.cpu_sets is not None:
+            # pid 0 is the calling thread; OpenMP threads it spawns inherit the mask
+            os.sched_setaffinity(0, self.cpu_sets[index % self.replicas])
+
+    def describe(self) -> dict:
+        return {
+            "replicas": self.replicas,
+            "threads_per_replica": self.threads_per_replica,
+            "cpu_sets": [sorted(cpu_set) for cpu_set in self.cpu_sets] if self.cpu_sets else None
+        }
+
+
+def candidate_layouts(cpu_count=None, pin_cpus=False):
+    """Every replicas × threads split of the CPUs, replicas in powers of two."""
+    cpus = available_cpus()
+    cpu_count = cpu_count or len(cpus)
+    layouts = []
+    replicas = 1
+    while replicas <= cpu_count:
+        layouts.append(ReplicaLayout(replicas, cpu_count // replicas, pin_cpus=pin_cpus, cpus=cpus))
+        replicas *= 2
+    return layouts
@@ -0,0 +1,137 @@
+import heapq
+import statistics
+import threading
+import time
+
+
+class RoutingGraph:
+    """
+    Language-pair routing graph built from the models ModelManager knows about.
+
+    Every (model_type, model_key, src_lang, tgt_lang) a model covers becomes
+    an edge. The cost of an edge, in milliseconds per source word, is a
+    fixed per-hop penalty ``hop_cost`` plus the model's measured decode
+    latency. A model that hasn't been measured yet is costed at the median
+    of the measured ones, so it is neither preferred over nor ruled out
+    against known models; ``default_ms_per_word`` only applies while
+    nothing has been measured. Cheapest
+    routes for all language pairs are precomputed into a table that is
+    rebuilt at most every ``refresh_seconds`` so live latencies feed in.
+    """
+
+    def __init__(self, model_pairs, latency_fn=None, hop_cost=2.0, default_ms_per_word=5.0,
+                 max_hops=3, refresh_seconds=30.0):
+        self.latency_fn = latency_fn or (lambda model_key: None)
+        self.hop_cost = hop_cost
+        self.default_ms_per_word = default_ms_per_word
+        self.max_hops = max_hops
+        self.refresh_seconds = refresh_seconds
+
+        # src_lang -> tgt_lang -> [(model_type, model_key), ...]
+        self.edges = {}
+        self.model_types = {}
+        for model_type, model_key, src_lang, tgt_lang in model_pairs:
+            self.edges.setdefault(src_lang, {}).setdefault(tgt_lang, []).append((model_type, model_key))
+            self.edges.setdefault(tgt_lang, {})
+            self.model_types[model_key] = model_type
+
+        self.languages = sorted(self.edges)
+        self._unmeasured_ms_per_word = default_ms_per_word
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._built_at = 0.0
+        self.rebuild()
+
+    def edge_cost(self, model_key):
+        latency = self.latency_fn(model_key)
+        return self.hop_cost + (latency if latency is not None else self._unmeasured_ms_per_word)
+
+    def _cheapest_edge(self, src_lang, tgt_lang):
+        candidates = self.edges.get(src_lang, {}).get(tgt_lang, [])
+        if not candidates:
+            return None
+        return min(candidates, key=lambda candidate: self.edge_cost(candidate[1]))
+
+    def _shortest_paths_from(self, source):
+        # Dijkstra over languages; states carry the hop count so max_hops holds
+        best = {source: 0.0}
+        paths = {source: []}
+        heap = [(0.0, source, [])]
+        while heap:
+            cost, lang, path = heapq.heappop(heap)
+            if cost > best.get(lang, float("inf")) or len(path) >= self.max_hops:
+                continue
+            for next_lang in self.edges.get(lang, {}):
+                _, model_key = self._cheapest_edge(lang, next_lang)
+                next_cost = cost + self.edge_cost(model_key)
+                if next_cost < best.get(next_lang, float("inf")):
+                    best[next_lang] = next_cost
+                    next_path = path + [(lang, next_lang, model_key)]
+                    paths[next_lang] = next_path
+                    heapq.heappush(heap, (next_cost, next_lang, next_path))
+        return best, paths
+
+    def rebuild(self):
+        measured = [
+            latency for latency in map(self.latency_fn, self.model_types) if latency is not None
+        ]
+        self._unmeasured_ms_per_word = statistics.median(measured) if measured else self.default_ms_per_word
+        routes = {}
+        for source in self.languages:
+            costs, paths = self._shortest_paths_from(source)
+            for target, path in paths.items():
+                if target != source:
+                    routes[(source, target)] = {"hops": path, "cost": costs[target]}
+        with self._lock:
+            self._routes = routes
+            self._built_at = time.time()
+
+    def _maybe_refresh(self):
+        if time.time() - self._built_at >= self.refresh_seconds:
+            self.rebuild()
+
+    def route(self, src_lang, tgt_lang):
+        """
+        Cheapest route as {"hops": [(src, tgt, model_key), ...], "cost": float},
+        or None when the pair can't be reached.
+        """
+        self._maybe_refresh()
+        with self._lock:
+            return self._routes.get((src_lang, tgt_lang))
+
+    def model_for(self, src_lang, tgt_lang):
+        edge = self._cheapest_edge(src_lang, tgt_lang)
+        if edge is None:
+            raise ValueError(f"No model translates {src_lang} → {tgt_lang}")
+        return edge[1]
+
+    def has_edge(self, src_lang, tgt_lang):
+        return bool(self.edges.get(src_lang, {}).get(tgt_lang))
+
+    def direct_pairs(self):
+        return [(src, tgt) for src, targets in self.edges.items() for tgt in targets]
+
+    def targets_from(self, src_lang, include_multistep=True):
+        self._maybe_refresh()
+        with self._lock:
+            return [
+                tgt for (src, tgt), route in self._routes.items()
+                if src == src_lang and (include_multistep or len(route["hops"]) == 1)
+            ]
+
+    def get_table(self) -> dict:
+        self._maybe_refresh()
+        with self._lock:
+            return {
+                "built_at": self._built_at,
+                "routes": [
+                    {
+                        "source_language": src,
+                        "target_language": tgt,
+                        "path": [src] + [hop[1] for hop in route["hops"]],
+                        "models": [hop[2] for hop in route["hops"]],
+                        "estimated_cost": round(route["cost"], 3)
+                    }
+                    for (src, tgt), route in sorted(self._routes.items())
+                ]
+            }
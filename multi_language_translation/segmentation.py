@@ -0,0 +1,155 @@
+import re
+
+# Sentence-final punctuation that needs no following space: Devanagari
+# danda / double danda, Urdu full stop, Arabic question mark and CJK
+# full-width terminators.
+_UNSPACED_TERMINATORS = "।॥۔؟。！？"
+
+# Latin terminators only end a sentence when followed by whitespace, so
+# "3.14" and URLs are left alone. A lone "." after a known abbreviation
+# ("Dr.", "etc.") or after initials and dotted forms ("J.", "U.S.",
+# "e.g.", "p.m.") doesn't end one either.
+_LATIN_TERMINATORS = ".!?"
+
+# Left out: ones that are also everyday sentence-final words ("no", "sun")
+_ABBREVIATIONS = frozenset((
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "rev", "hon", "capt", "lt", "sgt",
+    "gov", "vs", "etc", "approx", "dept", "inc", "ltd", "corp", "vol", "fig", "pp",
+    "jan", "feb", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+    "mon", "tue", "thu", "fri",
+))
+_INITIALS = re.compile(r"(?:[^\W\d_]\.)*[^\W\d_]")
+_WORD_BEFORE = re.compile(r"[^\s\"'(\[{«“‘]+$")
+
+_CLOSERS = "\"'”’)]}»」』"
+
+_SENTENCE_END = re.compile(
+    rf"(?:[{_UNSPACED_TERMINATORS}]+[{re.escape(_CLOSERS)}]*"
+    rf"|[{re.escape(_LATIN_TERMINATORS)}]+[{re.escape(_CLOSERS)}]*(?=\s))"
+)
+
+# Fallback split points for single sentences that are still too long:
+# clause punctuation first, then whitespace
+_CLAUSE_END = re.compile(r"[,;:،؛、，；：]+(?=\s|$)|[、，；：]")
+_WORD = re.compile(r"\s*\S+\s*")
+
+
+def _is_abbreviation(text, match):
+    if match.group() != ".":
+        return False
+    word = _WORD_BEFORE.search(text, 0, match.start())
+    if word is None:
+        return False
+    word = word.group()
+    return word.lower() in _ABBREVIATIONS or _INITIALS.fullmatch(word) is not None
+
+
+def _split_spans(text, pattern, keep_together=None):
+    """
+    Split text after every match of pattern, keeping all characters.
+    Matches for which ``keep_together(text, match)`` is true aren't split at.
+    """
+    spans = []
+    start = 0
+    for match in pattern.finditer(text):
+        if keep_together is not None and keep_together(text, match):
+            continue
+        spans.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        spans.append(text[start:])
+    return spans
+
+
+def _pack(parts, max_chars):
+    """Concatenate consecutive parts into pieces of at most max_chars where possible."""
+    pieces = []
+    current = ""
+    for part in parts:
+        if current and len(current) + len(part) > max_chars:
+            pieces.append(current)
+            current = ""
+        current += part
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _split_words(text, max_chars):
+    # Whitespace-free runs longer than max_chars (CJK, long tokens) are cut hard
+    parts = []
+    for word in _WORD.findall(text) or [text]:
+        parts.extend(word[start:start + max_chars] for start in range(0, len(word), max_chars))
+    return _pack(parts, max_chars)
+
+
+def _split_long(sentence, max_chars):
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    pieces = []
+    for piece in _pack(_split_spans(sentence, _CLAUSE_END), max_chars):
+        pieces.extend(_split_words(piece, max_chars) if len(piece) > max_chars else [piece])
+    return pieces
+
+
+class Segmentation:
+    """
+    A text split into sentences, keeping the whitespace around each one so
+    translations can be put back together in the original layout.
+    """
+
+    def __init__(self, pieces):
+        # (leading whitespace, sentence, trailing whitespace)
+        self.pieces = pieces
+
+    @property
+    def sentences(self):
+        return [sentence for _, sentence, _ in self.pieces]
+
+    def join(self, translations, tgt_lang):
+        parts = []
+        for index, ((leading, _, trailing), translated) in enumerate(zip(self.pieces, translations)):
+            if tgt_lang == "zh" and "\n" not in leading:
+                # Chinese doesn't put spaces between sentences
+                leading = ""
+            parts.append(leading)
+            parts.append(translated)
+            is_last = index == len(self.pieces) - 1
+            if tgt_lang == "zh" and "\n" not in trailing and not is_last:
+                trailing = ""
+            elif tgt_lang != "zh" and not trailing and not is_last and not self.pieces[index + 1][0]:
+                # Source had no space (e.g. CJK), but the target language needs one
+                trailing = " "
+            parts.append(trailing)
+        return "".join(parts)
+
+
+def segment_text(text, min_chars=200, max_sentence_chars=400):
+    """
+    Split ``text`` into sentences if it is at least ``min_chars`` long.
+    Shorter texts come back as a single piece. Sentences longer than
+    ``max_sentence_chars`` are further split at clause punctuation and,
+    failing that, at whitespace, so no piece is longer than that.
+    """
+    if len(text) < min_chars or not text.strip():
+        return Segmentation([("", text, "")])
+
+    pieces = []
+    for line in text.splitlines(keepends=True):
+        for span in _split_spans(line, _SENTENCE_END, keep_together=_is_abbreviation):
+            for chunk in _split_long(span, max_sentence_chars):
+                stripped = chunk.strip()
+                if not stripped:
+                    # Pure whitespace: attach to the previous piece
+                    if pieces:
+                        leading, sentence, trailing = pieces[-1]
+                        pieces[-1] = (leading, sentence, trailing + chunk)
+                    else:
+                        pieces.append((chunk, "", ""))
+                    continue
+                start = chunk.index(stripped[0])
+                end = start + len(stripped)
+                pieces.append((chunk[:start], stripped, chunk[end:]))
+
+    return Segmentation(pieces)
@@ -0,0 +1,125 @@
+"""
+Multi-worker server for multi_language_translation with shared model weights.
+
+Running ``uvicorn main:app --workers N`` spawns N fresh interpreters and each
+one loads its own copy of every model. This launcher instead loads the models
+once in the parent process, moves their weights into shared memory, and then
+forks N uvicorn workers that all accept on one listening socket. The workers
+read the same physical weight pages, so RAM no longer grows with the worker
+count. Each worker is limited to its own intra-op thread budget so workers
+don't oversubscribe the cores.
+
+    python serve.py --workers 4 --threads-per-worker 2
+
+Shared memory lives in /dev/shm, so containers need a large enough
+``shm_size``.
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+
+import config
+
+
+def _bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock, host, port, threads_per_worker, warmup_models, translator):
+    import torch
+    import uvicorn
+
+    torch.set_num_threads(threads_per_worker)
+    if warmup_models:
+        translator.core_translator.preload_models(warmup_models, warmup=True)
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="info"))
+    server.run(sockets=[sock])
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Serve translation with shared model weights")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=config.SERVE_WORKERS)
+    parser.add_argument("--threads-per-worker", type=int, default=config.SERVE_THREADS_PER_WORKER,
+                        help="Intra-op threads per worker (default: cores / workers)")
+    parser.add_argument("--models", default=",".join(config.PRELOAD_MODELS),
+                        help="Comma-separated model keys to load before forking (default: all)")
+    args = parser.parse_args()
+
+    workers = max(1, args.workers)
+    threads_per_worker = args.threads_per_worker or max(1, cpu_count // workers)
+
+    # Load the models here rather than when the service is created, so the
+    # warmup generate runs in the workers after fork, not in the parent.
+    config.PRELOAD_MODELS = []
+    from main import app
+    from endpoint import translator
+
+    core = translator.core_translator
+    model_keys = [key.strip() for key in args.models.split(",") if key.strip()] or [
+        model_key for model_type in core.model_manager.model_configs.values() for model_key in model_type
+    ]
+    core.preload_models(model_keys, warmup=False)
+    shared = core.share_model_memory()
+    print(f"Shared model weights across workers: {', '.join(shared) or 'none'}")
+
+    sock = _bind_socket(args.host, args.port)
+    children = set()
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                _run_worker(app, sock, args.host, args.port, threads_per_worker, model_keys, translator)
+            finally:
+                os._exit(0)
+        children.add(pid)
+        print(f"Started worker {pid} with {threads_per_worker} threads")
+
+    stopping = False
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {status}, restarting")
+            spawn()
+
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
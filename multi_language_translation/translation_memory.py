@@ -0,0 +1,175 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TranslationMemory:
+    """
+    Two-tier translation cache: an in-process LRU in front of a SQLite store.
+
+    Entries are keyed on normalized source text, language pair and model id,
+    expire after ``ttl_seconds`` and are evicted least-recently-used once a
+    tier exceeds its size limit. With ``db_path=None`` only the in-process
+    tier is used.
+    """
+
+    def __init__(self, db_path, max_memory_entries=10000, max_disk_entries=1000000, ttl_seconds=30 * 24 * 3600):
+        self.db_path = Path(db_path) if db_path is not None else None
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._conn = None
+        if self.db_path is None:
+            return
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connect()
+        # SQLite connections must not cross fork(); workers forked by
+        # serve.py open their own.
+        os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                key TEXT PRIMARY KEY,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON translations (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text, src_lang, tgt_lang, model_id):
+        raw = "\x1f".join((model_id, src_lang, tgt_lang, normalize_text(text)))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                translation, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return translation
+                del self._memory[key]
+
+            if self._conn is None:
+                self._counters["misses"] += 1
+                return None
+
+            row = self._conn.execute(
+                "SELECT translation, created_at FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                translation, created_at = row
+                if now - created_at <= self.ttl_seconds:
+                    self._conn.execute(
+                        "UPDATE translations SET last_access = ? WHERE key = ?", (now, key)
+                    )
+                    self._conn.commit()
+                    self._put_memory(key, translation, created_at)
+                    self._counters["disk_hits"] += 1
+                    return translation
+                self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                self._conn.commit()
+
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key, translation):
+        self.put_many([(key, translation)])
+
+    def put_many(self, entries):
+        now = time.time()
+        with self._lock:
+            for key, translation in entries:
+                self._put_memory(key, translation, now)
+            self._counters["writes"] += len(entries)
+            if self._conn is None:
+                return
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, translation, now, now) for key, translation in entries]
+            )
+            self._evict_disk()
+            self._conn.commit()
+
+    def _put_memory(self, key, translation, created_at):
+        self._memory[key] = (translation, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _evict_disk(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            self._counters["evictions"] += overflow
+
+    def purge_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [key for key, (_, created_at) in self._memory.items() if created_at < cutoff]
+            for key in expired:
+                del self._memory[key]
+            if self._conn is None:
+                return len(expired)
+            cursor = self._conn.execute("DELETE FROM translations WHERE created_at < ?", (cutoff,))
+            self._conn.commit()
+            return len(expired) + cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is None:
+                return
+            self._conn.execute("DELETE FROM translations")
+            self._conn.commit()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            disk_entries = 0
+            if self._conn is not None:
+                disk_entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            return {
+                "db_path": str(self.db_path) if self.db_path is not None else None,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "max_memory_entries": self.max_memory_entries,
+                "max_disk_entries": self.max_disk_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                **self._counters
+            }
@@ -1,18 +1,66 @@
 import os
+import json
+import time
 from pathlib import Path
 from core_translator import CoreTranslator
+from decoding_profiles import DEFAULT_PROFILE, validate_profile
+from inference_executor import RequestCancelledError
+import config
 
 class TranslationService:
-    def __init__(self):
-        self.models_dir = self._setup_models_directory()
-        self.core_translator = CoreTranslator(self.models_dir)
+    def __init__(self, models_dir="ds_models/translation"):
+        self.models_dir = self._setup_models_directory(models_dir)
+        self.core_translator = CoreTranslator(
+            self.models_dir,
+            file_batch_size=config.FILE_BATCH_SIZE,
+            json_stream_batch_strings=config.JSON_STREAM_BATCH_STRINGS,
+            csv_window_rows=config.CSV_WINDOW_ROWS,
+            csv_max_failed_values=config.CSV_MAX_FAILED_VALUES,
+            model_memory_budget_mb=config.MODEL_MEMORY_BUDGET_MB,
+            inference_backend=config.INFERENCE_BACKEND,
+            segment_min_chars=config.SEGMENT_MIN_CHARS,
+            max_sentence_chars=config.SEGMENT_MAX_SENTENCE_CHARS,
+            pivot_cache_entries=config.PIVOT_CACHE_ENTRIES,
+            pivot_pipeline_depth=config.PIVOT_PIPELINE_DEPTH,
+            extra_models=self._load_extra_models(),
+            routing_hop_cost=config.ROUTING_HOP_COST,
+            verify_model_checksums=config.VERIFY_MODEL_CHECKSUMS
+        )
+        if config.PRELOAD_MODELS:
+            self.core_translator.preload_models(config.PRELOAD_MODELS)
+        if config.BATCHING_ENABLED:
+            self.core_translator.enable_batching(
+                max_batch_size=config.BATCH_MAX_SIZE,
+                max_wait_ms=config.BATCH_MAX_WAIT_MS,
+                replicas=config.REPLICAS,
+                threads_per_replica=config.THREADS_PER_REPLICA,
+                pin_cpus=config.REPLICA_PIN_CPUS
+            )
+        if config.PIPELINE_CPU_WORKERS:
+            self.core_translator.enable_pipeline(
+                cpu_workers=config.PIPELINE_CPU_WORKERS,
+                depth=config.PIPELINE_DEPTH
+            )
+        if config.TM_ENABLED:
+            self.core_translator.enable_translation_memory(
+                config.TM_DB_PATH,
+                max_memory_entries=config.TM_MAX_MEMORY_ENTRIES,
+                max_disk_entries=config.TM_MAX_DISK_ENTRIES,
+                ttl_seconds=config.TM_TTL_SECONDS
+            )
     
-    def _setup_models_directory(self):
-        models_dir = "ds_models/translation"  
+    def _load_extra_models(self):
+        if not config.EXTRA_MODELS_FILE:
+            return None
+        with open(config.EXTRA_MODELS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    def _setup_models_directory(self, models_dir):
         Path(models_dir).mkdir(parents=True, exist_ok=True)
         return models_dir
     
-    def translate_text(self, text: str, src_lang: str, tgt_lang: str) -> dict:
+    def translate_text(self, text: str, src_lang: str, tgt_lang: str, profile: str = None,
+                       latency_budget_ms: float = None, include_timings: bool = False) -> dict:
         try:
             if not text.strip():
                 return {"status": "error", "error": "Empty text provided"}
@@ -26,9 +74,14 @@ class TranslationService:
                     "status": "success"
                 }
             
-            result = self.core_translator.translate_with_routing(text, src_lang, tgt_lang)
+            result = self.core_translator.translate_with_routing(
+                text, src_lang, tgt_lang, profile=profile, latency_budget_ms=latency_budget_ms,
+                include_timings=include_timings
+            )
             return result
             
+        except RequestCancelledError:
+            raise
         except Exception as e:
             return {
                 "status": "error",
@@ -37,6 +90,38 @@ class TranslationService:
                 "target_language": tgt_lang
             }
     
+    def translate_fanout(self, texts: list, src_lang: str, tgt_langs: list, profile: str = None,
+                         batch_size: int = None) -> dict:
+        try:
+            if not texts or not any(text.strip() for text in texts):
+                return {"status": "error", "error": "Empty text provided"}
+            if not tgt_langs:
+                return {"status": "error", "error": "No target languages provided"}
+            
+            profile = validate_profile(profile or DEFAULT_PROFILE)
+            start_time = time.time()
+            translations = self.core_translator.translate_fanout(
+                texts, src_lang, tgt_langs, batch_size=batch_size, profile=profile
+            )
+            return {
+                "translations": translations,
+                "source_language": src_lang,
+                "target_languages": list(translations),
+                "decoding_profile": profile,
+                "decode_ms": round((time.time() - start_time) * 1000, 2),
+                "status": "success"
+            }
+            
+        except RequestCancelledError:
+            raise
+        except Exception as e:
+            return {
+                "status": "error",
+                "error": str(e),
+                "source_language": src_lang,
+                "target_languages": tgt_langs
+            }
+    
     def translate_file(self, input_path: str, output_path: str, src_lang: str, tgt_lang: str, **kwargs) -> dict:
         try:
             if not os.path.exists(input_path):
@@ -52,5 +137,48 @@ class TranslationService:
                 "input_file": input_path
             }
     
+    def translate_stream(self, source, target, file_ext: str, src_lang: str, tgt_lang: str, **kwargs) -> dict:
+        try:
+            return self.core_translator.process_stream(source, target, file_ext, src_lang, tgt_lang, **kwargs)
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+    
+    def is_pair_supported(self, src_lang: str, tgt_lang: str) -> bool:
+        return self.core_translator.is_pair_supported(src_lang, tgt_lang)
+    
+    def translate_lines(self, lines: list, src_lang: str, tgt_lang: str, batch_size: int = None,
+                        profile: str = None) -> list:
+        return self.core_translator.translate_lines(
+            lines, src_lang, tgt_lang, batch_size=batch_size, profile=profile or DEFAULT_PROFILE
+        )
+    
+    def translate_batch(self, texts: list, src_lang: str, tgt_lang: str, batch_size: int = None,
+                        keep_source_on_error: bool = False, profile: str = None) -> list:
+        return self.core_translator.translate_batch(
+            texts, src_lang, tgt_lang, batch_size=batch_size,
+            keep_source_on_error=keep_source_on_error, profile=profile or DEFAULT_PROFILE
+        )
+    
     def get_supported_languages(self) -> dict:
-        return self.core_translator.get_supported_languages()
\ No newline at end of file
+        return self.core_translator.get_supported_languages()
+    
+    def get_routing_table(self) -> dict:
+        return self.core_translator.get_routing_table()
+    
+    def get_decoding_profiles(self) -> dict:
+        return self.core_translator.get_decoding_profiles()
+    
+    def get_model_status(self) -> dict:
+        return self.core_translator.get_model_status()
+    
+    def get_batching_stats(self) -> dict:
+        return self.core_translator.get_batching_stats()
+    
+    def get_pipeline_stats(self) -> dict:
+        return self.core_translator.get_pipeline_stats()
+    
+    def get_translation_memory_stats(self) -> dict:
+        return self.core_translator.get_translation_memory_stats()
+    
+    def clear_translation_memory(self) -> dict:
+        return self.core_translator.clear_translation_memory()
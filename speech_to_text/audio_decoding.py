@@ -0,0 +1,128 @@
+import io
+import math
+import subprocess
+import tempfile
+import wave
+from functools import lru_cache
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+# Whisper's input: mono float32 in [-1, 1] at 16 kHz
+SAMPLE_RATE = 16000
+
+
+class AudioDecodingError(ValueError):
+    pass
+
+
+def decode_audio(data: bytes) -> np.ndarray:
+    """
+    Decode uploaded audio bytes into a mono 16 kHz float32 array without
+    touching the disk. PCM WAV is parsed and resampled in-process; anything
+    else is piped through ffmpeg's stdin/stdout.
+    """
+    if not data:
+        raise AudioDecodingError("Empty audio upload")
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            return _decode_wav(data)
+        except (wave.Error, EOFError):
+            # Float, A-law, extensible and other WAV encodings the stdlib can't read
+            pass
+    return _decode_ffmpeg(data)
+
+
+def _decode_wav(data):
+    with wave.open(io.BytesIO(data), "rb") as reader:
+        channels = reader.getnchannels()
+        sample_width = reader.getsampwidth()
+        sample_rate = reader.getframerate()
+        frames = reader.readframes(reader.getnframes())
+
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values = np.where(values & 0x800000, values - 0x1000000, values)
+        samples = values.astype(np.float32) / 8388608.0
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise wave.Error(f"Unsupported sample width: {sample_width}")
+
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return resample(samples, sample_rate)
+
+
+@lru_cache(maxsize=16)
+def _sinc_kernel(orig_freq, new_freq, lowpass_filter_width=6, rolloff=0.99):
+    # Hann-windowed sinc polyphase filter, one row per output phase
+    base_freq = min(orig_freq, new_freq) * rolloff
+    width = math.ceil(lowpass_filter_width * orig_freq / base_freq)
+    idx = torch.arange(-width, width + orig_freq, dtype=torch.float64)[None, None] / orig_freq
+    t = torch.arange(0, -new_freq, -1, dtype=torch.float64)[:, None, None] / new_freq + idx
+    t = (t * base_freq).clamp(-lowpass_filter_width, lowpass_filter_width)
+    window = torch.cos(t * math.pi / lowpass_filter_width / 2) ** 2
+    t = t * math.pi
+    kernel = torch.where(t == 0, torch.ones_like(t), torch.sin(t) / t)
+    kernel = kernel * window * (base_freq / orig_freq)
+    return kernel.to(torch.float32), width
+
+
+def resample(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Band-limited resampling of mono float32 ``samples`` to SAMPLE_RATE."""
+    if sample_rate == SAMPLE_RATE or len(samples) == 0:
+        return np.ascontiguousarray(samples, dtype=np.float32)
+
+    gcd = math.gcd(sample_rate, SAMPLE_RATE)
+    orig_freq, new_freq = sample_rate // gcd, SAMPLE_RATE // gcd
+    kernel, width = _sinc_kernel(orig_freq, new_freq)
+
+    length = len(samples)
+    waveform = torch.from_numpy(np.ascontiguousarray(samples, dtype=np.float32)).view(1, 1, length)
+    waveform = F.pad(waveform, (width, width + orig_freq))
+    with torch.no_grad():
+        resampled = F.conv1d(waveform, kernel, stride=orig_freq)
+    resampled = resampled.transpose(1, 2).reshape(-1)
+    return resampled[:math.ceil(new_freq * length / orig_freq)].numpy()
+
+
+def _ffmpeg_command(source):
+    # Same conversion whisper.load_audio asks ffmpeg for
+    return [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", source,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"
+    ]
+
+
+def _decode_ffmpeg(data):
+    try:
+        process = subprocess.run(_ffmpeg_command("pipe:0"), input=data, capture_output=True)
+    except FileNotFoundError:
+        raise AudioDecodingError("ffmpeg is required to decode compressed audio")
+
+    if process.returncode != 0 or not process.stdout:
+        stderr = process.stderr.decode(errors="ignore")
+        # MP4/MOV files with the index at the end can't be read from a pipe;
+        # those alone go through a temp file, removed as soon as it's read
+        if "moov atom not found" not in stderr:
+            raise AudioDecodingError(f"Could not decode audio: {_last_line(stderr)}")
+        with tempfile.NamedTemporaryFile(suffix=".audio") as f:
+            f.write(data)
+            f.flush()
+            process = subprocess.run(_ffmpeg_command(f.name), capture_output=True)
+        if process.returncode != 0:
+            raise AudioDecodingError(f"Could not decode audio: {_last_line(process.stderr.decode(errors='ignore'))}")
+
+    return np.frombuffer(process.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def _last_line(stderr):
+    lines = stderr.strip().splitlines()
+    return lines[-1] if lines else "ffmpeg failed"
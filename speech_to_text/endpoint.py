@@ -1,14 +1,52 @@
-from fastapi import APIRouter, UploadFile,File
+import os
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 from whisper_service import WhisperService
+from audio_decoding import AudioDecodingError
+from inference_executor import BoundedInferenceExecutor, QueueFullError, RequestCancelledError
+
+# Batching: concurrent requests' 30 s windows are decoded together
+BATCHING_ENABLED = os.getenv("STT_BATCHING_ENABLED", "true").lower() in ("1", "true", "yes")
+BATCH_MAX_SIZE = int(os.getenv("STT_BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("STT_BATCH_MAX_WAIT_MS", "50"))
+# 0 decodes greedily
+BEAM_SIZE = int(os.getenv("STT_BEAM_SIZE", "0"))
 
 router = APIRouter(tags=["speech_to_text"])
 whisper_service = WhisperService()
+if BATCHING_ENABLED:
+    whisper_service.enable_batching(BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BEAM_SIZE)
+inference_executor = BoundedInferenceExecutor(
+    # With batching, one worker per batch slot so concurrent requests can meet in a batch
+    max_workers=int(os.getenv("STT_INFERENCE_MAX_WORKERS", str(BATCH_MAX_SIZE if BATCHING_ENABLED else 1))),
+    max_queue=int(os.getenv("STT_INFERENCE_MAX_QUEUE", "8")),
+    name="stt"
+)
 
 @router.post("/speech-to-text/")
-async def speech_to_text(file: UploadFile = File(...)):
+async def speech_to_text(request: Request, file: UploadFile = File(...)):
+    # Decoded in memory by the worker; nothing is written to disk
     contents = await file.read()
-    temp_path = f"/tmp/{file.filename}"
-    with open(temp_path, "wb") as f:
-        f.write(contents)
-    result = whisper_service.transcribe(temp_path)
-    return {"text": result}
\ No newline at end of file
+    try:
+        # Stops between Whisper windows once the client has disconnected
+        result = await inference_executor.run_cancellable(
+            request, whisper_service.transcribe, contents
+        )
+    except AudioDecodingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except RequestCancelledError as e:
+        raise HTTPException(status_code=499, detail=str(e))
+    return {"text": result}
+
+@router.get("/queue-stats/")
+async def queue_stats():
+    return inference_executor.get_stats()
+
+@router.get("/batching-stats/")
+async def batching_stats():
+    return whisper_service.get_batching_stats()
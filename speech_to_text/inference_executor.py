@@ -0,0 +1,169 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class QueueFullError(Exception):
+    """Raised when the executor's queue is full and the request is shed."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RequestCancelledError(Exception):
+    """Raised inside inference when the client that asked for it has gone away."""
+
+    def __init__(self):
+        super().__init__("Client disconnected, inference cancelled")
+
+
+class CancellationToken:
+    """Set once the request a piece of inference belongs to is abandoned."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise RequestCancelledError()
+
+
+_local = threading.local()
+
+
+def current_cancel_token():
+    """The token of the request this thread is running inference for, if any."""
+    return getattr(_local, "cancel_token", None)
+
+
+@contextmanager
+def attach_cancel_token(token):
+    previous = getattr(_local, "cancel_token", None)
+    _local.cancel_token = token
+    try:
+        yield token
+    finally:
+        _local.cancel_token = previous
+
+
+class BoundedInferenceExecutor:
+    """
+    Runs blocking inference on a dedicated thread pool with a bounded queue.
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue`` more
+    may wait; anything beyond that is rejected immediately with
+    ``QueueFullError`` so callers can shed load instead of piling up.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 16, name: str = "inference",
+                 disconnect_poll_seconds: float = 0.5):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.disconnect_poll_seconds = disconnect_poll_seconds
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+
+        self._in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._cancelled_queued = 0
+        self._cancelled_running = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+        self._max_wait = 0.0
+
+    def _estimate_retry_after(self) -> int:
+        avg_run = self._total_run / self._completed if self._completed else 1.0
+        waiting = max(0, self._in_flight - self.max_workers)
+        return max(1, math.ceil(avg_run * (waiting + 1) / self.max_workers))
+
+    async def run(self, fn, *args, **kwargs):
+        return await self._run(fn, args, kwargs, None)
+
+    async def run_cancellable(self, request, fn, *args, **kwargs):
+        """
+        Like run(), but watches ``request`` (a starlette Request) for a client
+        disconnect. Once the client is gone, a job still waiting is dropped
+        and a running one sees its token cancelled through
+        current_cancel_token(); either way RequestCancelledError is raised.
+        """
+        token = CancellationToken()
+
+        async def watch():
+            while not await request.is_disconnected():
+                await asyncio.sleep(self.disconnect_poll_seconds)
+            token.cancel()
+
+        watcher = asyncio.create_task(watch())
+        try:
+            return await self._run(fn, args, kwargs, token)
+        finally:
+            watcher.cancel()
+
+    async def _run(self, fn, args, kwargs, token):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise QueueFullError(self._estimate_retry_after())
+            self._in_flight += 1
+
+        enqueued_at = time.perf_counter()
+
+        def task():
+            if token is not None and token.cancelled:
+                with self._lock:
+                    self._cancelled_queued += 1
+                raise RequestCancelledError()
+
+            started_at = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                wait = started_at - enqueued_at
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            try:
+                with attach_cancel_token(token):
+                    return fn(*args, **kwargs)
+            except RequestCancelledError:
+                with self._lock:
+                    self._cancelled_running += 1
+                raise
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._total_run += time.perf_counter() - started_at
+
+        try:
+            return await asyncio.wrap_future(self._pool.submit(task))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            started = self._completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queue_depth": self._in_flight - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "cancelled": {"queued": self._cancelled_queued, "running": self._cancelled_running},
+                "avg_wait_ms": round(self._total_wait / started * 1000, 2) if started else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 2),
+                "avg_run_ms": round(self._total_run / self._completed * 1000, 2) if self._completed else 0.0
+            }
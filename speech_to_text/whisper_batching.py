@@ -0,0 +1,247 @@
+import queue
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE, log_mel_spectrogram, pad_or_trim
+from whisper.decoding import DecodingOptions
+from whisper.tokenizer import get_tokenizer
+
+from inference_executor import RequestCancelledError, current_cancel_token
+
+# Fallback thresholds, as in whisper.transcribe
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+class _Window:
+    __slots__ = ("mel", "language", "frames", "token", "future", "enqueued_at")
+
+    def __init__(self, mel, language, frames, token):
+        self.mel = mel
+        self.language = language
+        self.frames = frames
+        self.token = token
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+def _compression_ratio(text):
+    data = text.encode("utf-8")
+    return len(data) / len(zlib.compress(data)) if data else 0.0
+
+
+class WhisperBatchEngine:
+    """
+    Transcribes concurrent requests through shared Whisper batches.
+
+    Each request computes its own log-mel spectrogram and walks it 30 s
+    window by window, seeking to the last complete timestamp like
+    ``whisper.transcribe``. Windows from concurrent requests are queued
+    and one worker thread decodes up to ``max_batch_size`` of them at a
+    time: the encoder runs once on the stacked mels and greedy or beam
+    decoding proceeds for the whole batch together. A batch is flushed
+    when full or when its oldest window has waited ``max_wait_ms``.
+
+    Windows are decoded without the previous window's text as a prompt
+    (prompts can't differ within a batch); the language is detected on a
+    request's first window and fixed for the rest.
+    """
+
+    def __init__(self, model, max_batch_size=8, max_wait_ms=50.0, beam_size=None, best_of=5,
+                 stats_history=100):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.beam_size = beam_size or None
+        self.best_of = best_of
+        self.fp16 = model.device.type != "cpu"
+        # Mel frames per output timestamp step
+        self.input_stride = N_FRAMES // model.dims.n_audio_ctx
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._recent_batches = deque(maxlen=stats_history)
+        self._totals = {"batches": 0, "windows": 0, "errors": 0, "audio_seconds": 0.0, "decode_seconds": 0.0}
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._worker_loop, name="whisper-batch", daemon=True)
+                self._worker.start()
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        """Blocking; may be called from many threads at once."""
+        self._ensure_worker()
+        token = current_cancel_token()
+        mel = log_mel_spectrogram(audio, self.model.dims.n_mels, padding=N_SAMPLES)
+        content_frames = mel.shape[-1] - N_FRAMES
+        language = None if self.model.is_multilingual else "en"
+        texts = []
+
+        seek = 0
+        while seek < content_frames:
+            if token is not None:
+                token.raise_if_cancelled()
+            frames = min(N_FRAMES, content_frames - seek)
+            window = _Window(pad_or_trim(mel[:, seek:seek + frames], N_FRAMES), language, frames, token)
+            self._queue.put(window)
+            result = window.future.result()
+
+            language = language or result.language
+            tokenizer = get_tokenizer(
+                self.model.is_multilingual, num_languages=self.model.num_languages,
+                language=language, task="transcribe"
+            )
+            text, advance = self._consume(result, tokenizer, frames)
+            if text:
+                texts.append(text)
+            seek += advance
+
+        return "".join(texts)
+
+    def _consume(self, result, tokenizer, frames):
+        """(text, frames to advance) for one decoded window."""
+        # Silence, as whisper.transcribe judges it
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob <= LOGPROB_THRESHOLD:
+            return "", frames
+
+        tokens = torch.tensor(result.tokens)
+        timestamps = tokens.ge(tokenizer.timestamp_begin)
+        single_timestamp_ending = timestamps[-2:].tolist() == [False, True]
+        consecutive = torch.where(timestamps[:-1] & timestamps[1:])[0] + 1
+
+        advance = frames
+        if len(consecutive) > 0 and not single_timestamp_ending:
+            # The text after the last complete segment is decoded again
+            # from the next window, which starts at that segment's end
+            last_slice = consecutive[-1].item()
+            tokens = tokens[:last_slice]
+            advance = (tokens[-1].item() - tokenizer.timestamp_begin) * self.input_stride
+
+        text = tokenizer.decode([token for token in tokens.tolist() if token < tokenizer.eot])
+        return text, max(advance, 1)
+
+    def _collect_batch(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Windows whose client has gone away don't take a batch slot
+        live = []
+        for window in batch:
+            if window.token is not None and window.token.cancelled:
+                window.future.set_exception(RequestCancelledError())
+            else:
+                live.append(window)
+        return live
+
+    def _worker_loop(self):
+        while True:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+            started_at = time.perf_counter()
+            try:
+                # One language per decode; the first windows of new requests
+                # (language None) are detected per window inside the batch
+                groups = {}
+                for window in batch:
+                    groups.setdefault(window.language, []).append(window)
+                for language, windows in groups.items():
+                    for window, result in zip(windows, self._decode(windows, language)):
+                        window.future.set_result(result)
+            except Exception as e:
+                for window in batch:
+                    if not window.future.done():
+                        window.future.set_exception(e)
+                self._record_batch(batch, started_at, succeeded=False)
+            else:
+                self._record_batch(batch, started_at, succeeded=True)
+
+    def _decode(self, windows, language):
+        """Batched decode with whisper's temperature fallback for windows that fail the thresholds."""
+        mel = torch.stack([window.mel for window in windows]).to(self.model.device)
+        if self.fp16:
+            mel = mel.half()
+
+        results = [None] * len(windows)
+        pending = list(range(len(windows)))
+        for temperature in TEMPERATURES:
+            options = {"language": language, "task": "transcribe", "temperature": temperature, "fp16": self.fp16}
+            if temperature > 0:
+                options["best_of"] = self.best_of
+            elif self.beam_size:
+                options["beam_size"] = self.beam_size
+            decoded = self.model.decode(mel[pending], DecodingOptions(**options))
+
+            retry = []
+            for index, result in zip(pending, decoded):
+                results[index] = result
+                failed = (
+                    _compression_ratio(result.text) > COMPRESSION_RATIO_THRESHOLD
+                    or result.avg_logprob < LOGPROB_THRESHOLD
+                )
+                # Likely silence keeps its result, as in whisper.transcribe
+                silent = result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD
+                if failed and not silent:
+                    retry.append(index)
+            pending = retry
+            if not pending:
+                break
+        return results
+
+    def _record_batch(self, batch, started_at, succeeded):
+        decode_seconds = time.perf_counter() - started_at
+        audio_seconds = sum(window.frames for window in batch) * HOP_LENGTH / SAMPLE_RATE
+        entry = {
+            "batch_size": len(batch),
+            "audio_seconds": round(audio_seconds, 2),
+            "decode_ms": round(decode_seconds * 1000, 2),
+            # Processing time per second of audio; below 1 is faster than real time
+            "rtf": round(decode_seconds / audio_seconds, 4) if audio_seconds else None,
+            "max_wait_ms": round(max(started_at - window.enqueued_at for window in batch) * 1000, 2),
+            "status": "success" if succeeded else "error",
+            "timestamp": time.time()
+        }
+        with self._lock:
+            self._recent_batches.append(entry)
+            self._totals["batches"] += 1
+            self._totals["windows"] += len(batch)
+            self._totals["audio_seconds"] += audio_seconds
+            self._totals["decode_seconds"] += decode_seconds
+            if not succeeded:
+                self._totals["errors"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            totals = self._totals
+            batches = totals["batches"]
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "beam_size": self.beam_size,
+                "batches": batches,
+                "windows": totals["windows"],
+                "errors": totals["errors"],
+                "avg_batch_size": round(totals["windows"] / batches, 2) if batches else 0.0,
+                "audio_seconds": round(totals["audio_seconds"], 2),
+                "rtf": round(totals["decode_seconds"] / totals["audio_seconds"], 4) if totals["audio_seconds"] else None,
+                "queue_depth": self._queue.qsize(),
+                "recent_batches": list(self._recent_batches)
+            }
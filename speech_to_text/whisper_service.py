@@ -1,6 +1,30 @@
 from pathlib import Path
+from typing import Union
+import numpy as np
 import whisper
 
+from audio_decoding import decode_audio
+from inference_executor import current_cancel_token
+from whisper_batching import WhisperBatchEngine
+
+
+class _CancellableModel:
+    """
+    Stands in for the Whisper model inside ``whisper.transcribe`` and checks
+    the request's cancellation token before each 30 s segment is decoded.
+    """
+
+    def __init__(self, model, token):
+        self._model = model
+        self._token = token
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+    def decode(self, *args, **kwargs):
+        self._token.raise_if_cancelled()
+        return self._model.decode(*args, **kwargs)
+
 class WhisperService:
     """
     A service for transcribing audio using OpenAI's Whisper model.
@@ -14,6 +38,21 @@ class WhisperService:
         self.model_dir = model_dir
         self._ensure_model_directory(self.model_dir)
         self.model = whisper.load_model(model_name, download_root=str(self.model_dir))
+        self.batch_engine = None
+
+    def enable_batching(self, max_batch_size: int = 8, max_wait_ms: float = 50.0, beam_size: int = 0) -> None:
+        """
+        Route transcription through a WhisperBatchEngine so windows from
+        concurrent requests share encoder and decoder passes.
+        """
+        self.batch_engine = WhisperBatchEngine(
+            self.model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, beam_size=beam_size
+        )
+
+    def get_batching_stats(self) -> dict:
+        if self.batch_engine is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.batch_engine.get_stats()}
 
     def _ensure_model_directory(self, path: Path) -> None:
         """
@@ -21,11 +60,24 @@ class WhisperService:
         """
         path.mkdir(parents=True, exist_ok=True)
 
-    def transcribe(self, audio_path: Path) -> str:
+    def transcribe(self, audio: Union[bytes, np.ndarray, Path]) -> str:
         """
-        Transcribes the given audio file and returns the text.
+        Transcribes the given audio and returns the text. ``audio`` is the
+        raw bytes of an audio file, a 16 kHz mono float32 array, or a path.
         """
-        if not audio_path.exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
-        result = self.model.transcribe(str(audio_path))
+        if isinstance(audio, Path):
+            if not audio.exists():
+                raise FileNotFoundError(f"Audio file not found: {audio}")
+            audio = audio.read_bytes()
+        if isinstance(audio, (bytes, bytearray)):
+            audio = decode_audio(bytes(audio))
+
+        if self.batch_engine is not None:
+            return self.batch_engine.transcribe(audio)
+
+        token = current_cancel_token()
+        if token is None:
+            result = self.model.transcribe(audio)
+        else:
+            result = whisper.transcribe(_CancellableModel(self.model, token), audio)
         return result.get("text", "")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
 import os
@@ -7,12 +7,18 @@ import traceback
 from typing import Optional
 import uuid
 from tts_service import TTSService  
+from inference_executor import BoundedInferenceExecutor, QueueFullError, RequestCancelledError
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 tts_service = TTSService()  
+inference_executor = BoundedInferenceExecutor(
+    max_workers=int(os.getenv("TTS_INFERENCE_MAX_WORKERS", "1")),
+    max_queue=int(os.getenv("TTS_INFERENCE_MAX_QUEUE", "8")),
+    name="tts"
+)
 
 class TTSRequest(BaseModel):
     text: str
@@ -20,7 +26,7 @@ class TTSRequest(BaseModel):
     language: Optional[str] = "en"
 
 @router.post("/text-to-speech/")
-async def text_to_speech(request: TTSRequest):
+async def text_to_speech(request: TTSRequest, http_request: Request):
     try:
         logger.info(f"Received TTS request: {request.text[:50]}...")
 
@@ -34,12 +40,27 @@ async def text_to_speech(request: TTSRequest):
         output_path = os.path.join("output", filename)
 
         try:
-            tts_service.synthesize_speech(
+            # Stops between sentence chunks once the client has disconnected
+            await inference_executor.run_cancellable(
+                http_request,
+                tts_service.synthesize_speech,
                 text=request.text,
                 selected_voice=request.voice,
                 output_path=output_path
             )
             logger.info(f"TTS processing completed: {output_path}")
+        except QueueFullError as e:
+            logger.warning(f"TTS request rejected: {e}")
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        except RequestCancelledError as e:
+            logger.info(f"TTS request cancelled: {e}")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise HTTPException(status_code=499, detail=str(e))
         except Exception as tts_error:
             logger.error(f"TTS processing failed: {tts_error}")
             logger.error(f"Traceback: {traceback.format_exc()}")
@@ -61,3 +82,7 @@ async def text_to_speech(request: TTSRequest):
         logger.error(f"Unexpected error in text_to_speech: {e}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/queue-stats/")
+async def queue_stats():
+    return inference_executor.get_stats()
@@ -3,6 +3,8 @@ from pathlib import Path
 from langdetect import detect
 from TTS.api import TTS
 
+from inference_executor import current_cancel_token
+
 os.environ["COQUI_TOS_AGREED"] = "1"
 
 SPEAKER_WAVS = {
@@ -66,13 +68,45 @@ class TTSService:
         except Exception as e:
             raise ValueError(f"Language detection failed: {e}")
 
-        try:
-            self.tts.tts_to_file(
-                text=text.strip(),
-                speaker_wav=full_path,
-                language=lang_code,
-                file_path=output_path
-            )
-            print(f"Audio saved to: {output_path}")
-        except Exception as e:
-            raise RuntimeError(f"Voice synthesis failed: {e}")
+        token = current_cancel_token()
+        if token is None:
+            try:
+                self.tts.tts_to_file(
+                    text=text.strip(),
+                    speaker_wav=full_path,
+                    language=lang_code,
+                    file_path=output_path
+                )
+                print(f"Audio saved to: {output_path}")
+            except Exception as e:
+                raise RuntimeError(f"Voice synthesis failed: {e}")
+            return
+
+        self._synthesize_cancellable(text.strip(), full_path, lang_code, output_path, token)
+
+    def _synthesize_cancellable(self, text: str, speaker_wav: str, language: str, output_path: str, token) -> None:
+        """
+        tts_to_file() one sentence chunk at a time, checking the request's
+        cancellation token between chunks. Chunks are split the way the
+        synthesizer splits them, and each chunk already ends with the
+        synthesizer's inter-sentence silence, so plain concatenation gives
+        the same output.
+        """
+        synthesizer = self.tts.synthesizer
+        wav = []
+        for sentence in synthesizer.split_into_sentences(text):
+            token.raise_if_cancelled()
+            try:
+                chunk = self.tts.tts(
+                    text=sentence,
+                    speaker_wav=speaker_wav,
+                    language=language,
+                    split_sentences=False
+                )
+            except Exception as e:
+                raise RuntimeError(f"Voice synthesis failed: {e}")
+            wav += list(chunk)
+
+        token.raise_if_cancelled()
+        synthesizer.save_wav(wav, output_path)
+        print(f"Audio saved to: {output_path}")